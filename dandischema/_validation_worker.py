@@ -0,0 +1,99 @@
+"""
+Functions run in the worker processes of `dandischema.metadata.validate_parallel()`
+
+This module must not import `dandischema.models`, directly or indirectly, at module
+level, so that the DANDI instance configuration can be set in a worker process
+before the models are defined there.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import jsonschema.exceptions
+
+from .conf import Config, set_instance_config
+from .exceptions import JsonschemaValidationError
+
+
+class JsonschemaInvalid(ValueError):
+    """
+    Stand-in for a `JsonschemaValidationError` raised in a worker process, which
+    cannot be pickled back to the parent process as is since the jsonschema errors
+    it contains reference their validator's type checker. It carries the fields of
+    the errors instead, from which the errors are recreated in the parent process.
+    """
+
+    def __init__(self, errors: list[dict[str, Any]]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+    @classmethod
+    def from_error(cls, error: JsonschemaValidationError) -> JsonschemaInvalid:
+        return cls([_error_fields(e) for e in error.errors])
+
+    def to_error(self) -> JsonschemaValidationError:
+        """Recreate the `JsonschemaValidationError` this stands in for"""
+        return JsonschemaValidationError([_error_from_fields(f) for f in self.errors])
+
+
+def _error_fields(error: jsonschema.exceptions.ValidationError) -> dict[str, Any]:
+    return {
+        "message": error.message,
+        "validator": error.validator,
+        "path": list(error.relative_path),
+        "cause": error.cause,
+        "context": [_error_fields(e) for e in error.context or ()],
+        "validator_value": error.validator_value,
+        "instance": error.instance,
+        "schema": error.schema,
+        "schema_path": list(error.relative_schema_path),
+    }
+
+
+def _error_from_fields(fields: dict[str, Any]) -> jsonschema.exceptions.ValidationError:
+    return jsonschema.exceptions.ValidationError(
+        **{**fields, "context": [_error_from_fields(f) for f in fields["context"]]}
+    )
+
+
+def init_worker(config: Config, json_validation: bool) -> None:
+    """
+    Set the DANDI instance configuration of a worker process and, if JSON schema
+    validation is to be performed, warm up its cache of jsonschema validators
+    """
+    set_instance_config(config)
+
+    from .metadata import SCHEMA_MAP, _get_jsonschema_validator_local
+
+    if json_validation:
+        for schema_key in SCHEMA_MAP:
+            _get_jsonschema_validator_local(schema_key)
+
+
+def validate_chunk(
+    objs: list[dict],
+    schema_version: Optional[str],
+    schema_key: Optional[str],
+    json_validation: bool,
+) -> list[Optional[ValueError]]:
+    """
+    Validate a chunk of objects with `dandischema.metadata.validate_many()`,
+    replacing each `JsonschemaValidationError` in the results with a
+    `JsonschemaInvalid` stand-in
+    """
+    from .metadata import validate_many
+
+    return [
+        (
+            JsonschemaInvalid.from_error(r)
+            if isinstance(r, JsonschemaValidationError)
+            else r
+        )
+        for r in validate_many(
+            objs,
+            schema_version=schema_version,
+            schema_key=schema_key,
+            json_validation=json_validation,
+        )
+    ]
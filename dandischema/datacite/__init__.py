@@ -8,7 +8,6 @@ from copy import deepcopy
 from functools import lru_cache
 import json
 from pathlib import Path
-import re
 from typing import Any, Dict, Union
 
 from jsonschema import Draft7Validator
@@ -16,7 +15,8 @@ from jsonschema import Draft7Validator
 from dandischema.conf import get_instance_config
 
 from ..models import (
-    NAME_PATTERN,
+    LICENSE_RE,
+    NAME_RE,
     LicenseType,
     Organization,
     Person,
@@ -84,9 +84,8 @@ def _licenses_to_rights_list(licenses: list[LicenseType]) -> list[dict[str, str]
         The list of `LicenseType` objects
     """
     rights_list = []
-    license_pattern = re.compile(r"^([^:\s]+):(\S+)$")
     for license_ in licenses:
-        license_match = license_pattern.match(license_.value)
+        license_match = LICENSE_RE.match(license_.value)
         assert (
             license_match
         ), 'License is not of the expected format of "scheme:identifier"'
@@ -206,8 +205,8 @@ def to_datacite(
         }
         if isinstance(contr_el, Person):
             contr_dict["nameType"] = "Personal"
-            contr_dict["familyName"], contr_dict["givenName"] = re.findall(
-                NAME_PATTERN, contr_el.name
+            contr_dict["familyName"], contr_dict["givenName"] = NAME_RE.findall(
+                contr_el.name
             ).pop()
 
             if hasattr(contr_el, "affiliation") and contr_el.affiliation is not None:
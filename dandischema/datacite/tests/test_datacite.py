@@ -69,6 +69,18 @@ class TestLicensesToRightsList:
             with pytest.raises(AssertionError, match="not of the expected format"):
                 _licenses_to_rights_list(list(BadLicenseType))
 
+    def test_license_type(self) -> None:
+        """
+        Test parsing of a license of the `LicenseType` enum
+        """
+        assert _licenses_to_rights_list([LicenseType("spdx:CC0-1.0")]) == [
+            {
+                "rightsIdentifier": "CC0-1.0",
+                "rightsIdentifierScheme": "SPDX",
+                "schemeUri": "https://spdx.org/licenses/",
+            }
+        ]
+
     @pytest.mark.parametrize(
         "licenses",
         [
@@ -0,0 +1,164 @@
+"""
+Computation of the DANDI ETags of all files in a directory tree, with an on-disk
+cache that allows skipping files that have not changed since they were last
+digested
+
+Can also be run as a script::
+
+    python -m dandischema.digests.bulk [--cache CACHE_FILE] [--jobs N] DIRECTORY
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+from pathlib import Path
+import stat
+import sys
+from typing import Any, Dict, Optional, Sequence, Union
+
+from .dandietag import DandiETag
+
+logger = logging.getLogger(__name__)
+
+
+class DigestCache:
+    """
+    A cache of the DANDI ETags of files, keyed by path, that is persisted as a JSON
+    file
+
+    Files are keyed by their resolved absolute paths, so the same cache can be used
+    regardless of the working directory and of how the paths are given. A cached
+    digest is considered valid only if the size, modification time, and inode
+    number of the file are unchanged since the digest was computed.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        :param path: The path of the JSON file in which the cache is stored. If
+            `None`, the cache is kept only in memory.
+        """
+        self.path = Path(path) if path is not None else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if self.path is not None and self.path.exists():
+            with self.path.open() as fp:
+                self._entries = json.load(fp)
+
+    @staticmethod
+    def _stat_key(st: os.stat_result) -> Dict[str, int]:
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+    @staticmethod
+    def _path_key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path, st: os.stat_result) -> Optional[str]:
+        """
+        Get the cached DANDI ETag of a file if its stat information, `st`, matches
+        the one recorded with the digest
+        """
+        entry = self._entries.get(self._path_key(path))
+        if entry is None or any(
+            entry.get(k) != v for k, v in self._stat_key(st).items()
+        ):
+            return None
+        return str(entry["etag"])
+
+    def set(self, path: Path, st: os.stat_result, etag: str) -> None:
+        self._entries[self._path_key(path)] = {**self._stat_key(st), "etag": etag}
+
+    def save(self) -> None:
+        """Write the cache to its file, if any, replacing the file atomically"""
+        if self.path is None:
+            return
+        # A temporary file specific to this process is written first so that
+        # concurrent saves do not write to the same temporary file
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp.open("w") as fp:
+            json.dump(self._entries, fp)
+        os.replace(tmp, self.path)
+
+
+def digest_tree(
+    root: Union[str, Path],
+    cache: Optional[DigestCache] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[Path, str]:
+    """
+    Compute the DANDI ETags of all regular files under a directory
+
+    Entries that are not regular files, e.g., FIFOs or broken symbolic links, are
+    skipped, as are files that cannot be read; the latter are logged as warnings.
+
+    :param root: The directory to walk
+    :param cache: The cache to consult for, and to record, digests. Files whose
+        digests are found in the cache are not read. The cache is not saved by
+        this function.
+    :param max_workers: The maximum number of files to digest concurrently. If
+        `None`, the default of `concurrent.futures.ThreadPoolExecutor` is used.
+    :return: A mapping of the paths of the files, which are `root` joined with the
+        files' relative paths, to their DANDI ETags
+    """
+    if cache is None:
+        cache = DigestCache()
+    digests: Dict[Path, str] = {}
+    to_digest: list[tuple[Path, os.stat_result]] = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath, name)
+            try:
+                st = path.stat()
+            except OSError as e:
+                logger.warning("Skipping %s: %s", path, e)
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if (etag := cache.get(path, st)) is not None:
+                digests[path] = etag
+            else:
+                to_digest.append((path, st))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        etags = pool.map(_digest_file, (p for p, _ in to_digest))
+        for (path, st), etag in zip(to_digest, etags):
+            if etag is not None:
+                cache.set(path, st, etag)
+                digests[path] = etag
+    return {p: digests[p] for p in sorted(digests)}
+
+
+def _digest_file(path: Path) -> Optional[str]:
+    try:
+        return DandiETag.from_file(path).as_str()
+    except OSError as e:
+        logger.warning("Skipping %s: %s", path, e)
+        return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m dandischema.digests.bulk",
+        description="Print the DANDI ETags of all files under a directory",
+    )
+    parser.add_argument("directory", type=Path)
+    parser.add_argument(
+        "--cache", type=Path, help="JSON file in which to cache computed digests"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="Number of files to digest concurrently"
+    )
+    args = parser.parse_args(argv)
+    cache = DigestCache(args.cache)
+    try:
+        digests = digest_tree(args.directory, cache=cache, max_workers=args.jobs)
+    finally:
+        cache.save()
+    for path, etag in digests.items():
+        print(f"{etag}  {path.relative_to(args.directory).as_posix()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,26 @@
 # s3_file_field/_multipart.py>, copyright Kitware, Inc. <kitware@kitware.com>
 # under the Apache 2.0 license
 
+from array import array
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from functools import partial
 from hashlib import md5
+import io
 import math
 import os
-from typing import Iterator, List, NamedTuple, Optional, Type, Union
+from typing import (
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Type,
+    Union,
+)
 
 
 def mb(bytes_size: int) -> int:
@@ -27,6 +42,32 @@ class Part(NamedTuple):
     size: int
 
 
+class PartPlan(NamedTuple):
+    """
+    Columnar part layouts of multiple files, as computed by
+    `PartGenerator.for_file_sizes()`
+
+    All columns are `array.array` objects of signed 64-bit integers, which can be
+    wrapped without copying by anything supporting the buffer protocol, e.g.,
+    `numpy.frombuffer()`.
+    """
+
+    #: The number of parts of each file
+    part_qty: array
+    #: For each file, the index of its first part in the per-part columns below;
+    #: has one more element than there are files, so that the parts of file ``i``
+    #: are at indices ``part_start[i]`` to ``part_start[i + 1]``
+    part_start: array
+    #: For each part, the index of the file it belongs to
+    file_index: array
+    #: For each part, its (1-based) number
+    number: array
+    #: For each part, its offset in its file
+    offset: array
+    #: For each part, its size
+    size: array
+
+
 @dataclass
 class PartGenerator:
     part_qty: int
@@ -68,6 +109,36 @@ class PartGenerator:
             part_size = final_part_size
         return cls(part_qty, part_size, final_part_size)
 
+    @classmethod
+    def for_file_sizes(cls, file_sizes: Iterable[int]) -> PartPlan:
+        """
+        Calculate the part layouts of multiple files at once, returning them in
+        columnar form
+        """
+        plan = PartPlan(*(array("q") for _ in PartPlan._fields))
+        plan.part_start.append(0)
+        for i, file_size in enumerate(file_sizes):
+            pg = cls.for_file_size(file_size)
+            qty = pg.part_qty
+            plan.part_qty.append(qty)
+            plan.part_start.append(plan.part_start[-1] + qty)
+            if qty == 0:
+                continue
+            plan.file_index.extend(array("q", [i]) * qty)
+            plan.number.extend(range(1, qty + 1))
+            plan.offset.extend(
+                range(0, pg.initial_part_size * qty, pg.initial_part_size)
+            )
+            plan.size.extend(array("q", [pg.initial_part_size]) * (qty - 1))
+            plan.size.append(pg.final_part_size)
+        return plan
+
+    @property
+    def file_size(self) -> int:
+        if self.part_qty == 0:
+            return 0
+        return self.initial_part_size * (self.part_qty - 1) + self.final_part_size
+
     def __len__(self) -> int:
         return self.part_qty
 
@@ -96,14 +167,24 @@ class PartGenerator:
 class DandiETag:
     REGEX = r"[0-9a-f]{32}-\d{1,5}"
     MAX_STR_LENGTH = 38
+    # Size of the blocks in which `from_file()` reads and digests a file
+    READ_CHUNK_SIZE = mb(1)
+    # Size of the MD5 digest of a part
+    DIGEST_SIZE = 16
 
     def __init__(
         self, file_size: int, part_gen: Type[PartGenerator] = PartGenerator
     ) -> None:
         self._part_gen: PartGenerator = part_gen.for_file_size(file_size)
-        self._md5_digests: List[Optional[bytes]] = [None] * len(self._part_gen)
+        # The MD5 digests of the parts, packed back to back, and flags
+        # indicating which of them have been submitted
+        self._md5_digests = bytearray(self.DIGEST_SIZE * len(self._part_gen))
+        self._have_digest = bytearray(len(self._part_gen))
         self._next_index: int = 0
-        self._partial_blob: bytes = b""
+        # Running digest and size of the data of the next part received so far
+        # through `partial_update()`
+        self._partial_md5 = md5()
+        self._partial_size: int = 0
 
     @property
     def part_qty(self) -> int:
@@ -126,34 +207,137 @@ class DandiETag:
             return None
 
     def get_part_etag(self, p: Part) -> Optional[str]:
-        d = self._md5_digests[p.number - 1]
+        d = self._get_digest(p.number - 1)
         return d.hex() if d is not None else None
 
     def as_str(self) -> str:
         if not self.complete:
             raise ValueError("Not all part hashes submitted")
-        blob = b""
-        for d in self._md5_digests:
-            assert d is not None
-            blob += d
-        parts_digest = md5(blob).hexdigest()
-        return f"{parts_digest}-{len(self._md5_digests)}"
+        parts_digest = md5(self._md5_digests).hexdigest()
+        return f"{parts_digest}-{self.part_qty}"
 
     @classmethod
     def from_file(
-        cls, path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"]
+        cls,
+        path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
+        max_workers: Optional[int] = None,
     ) -> "DandiETag":
+        """
+        Compute the DANDI ETag of a file
+
+        Each part is read and digested `READ_CHUNK_SIZE` bytes at a time into a
+        reused buffer, so memory use does not depend on the part size.
+
+        :param path: The path of the file to digest
+        :param max_workers: If greater than 1, the parts of the file are read and
+            digested concurrently by a pool of up to this many threads, each
+            reading its part at the part's offset. Otherwise, the parts are
+            digested sequentially.
+        """
         etag = cls(file_size=os.path.getsize(path))
-        with open(path, "rb") as f:
-            for part in etag.get_parts():
-                etag.update(f.read(part.size))
+        if max_workers is not None and max_workers > 1 and etag.part_qty > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(
+                        _digest_file_part, path, part, cls.READ_CHUNK_SIZE
+                    ): part
+                    for part in etag.get_parts()
+                }
+                for fut in as_completed(futures):
+                    etag._add_digest(futures[fut], fut.result())
+        else:
+            buf = bytearray(cls.READ_CHUNK_SIZE)
+            with open(path, "rb") as f:
+                for part in etag.get_parts():
+                    etag._add_next_digest(_md5_digest_read(f, part, buf, path))
         return etag
 
+    @classmethod
+    async def from_file_async(
+        cls,
+        path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+    ) -> "DandiETag":
+        """
+        Asynchronous counterpart of `from_file()` that computes the DANDI ETag of
+        a file in `executor`, or in the event loop's default executor if it is
+        `None`, without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, partial(cls.from_file, path, max_workers=max_workers)
+        )
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Export the state of the etagger as a JSON-serializable `dict`, from which
+        an equivalent etagger can be recreated with `from_state()`
+
+        The state records the digests of all completed parts. Data submitted
+        through `partial_update()` for a part that is not yet complete is not
+        included, as the state of an in-progress MD5 cannot be exported; digesting
+        resumes from the start of that part, i.e., from `get_next_part()` of the
+        recreated etagger.
+        """
+        return {
+            "file_size": self._part_gen.file_size,
+            "part_qty": self.part_qty,
+            "part_digests": [
+                d.hex() if (d := self._get_digest(i)) is not None else None
+                for i in range(self.part_qty)
+            ],
+        }
+
+    @classmethod
+    def from_state(
+        cls, state: Dict[str, Any], part_gen: Type[PartGenerator] = PartGenerator
+    ) -> "DandiETag":
+        """
+        Recreate an etagger from a state exported by `get_state()`
+
+        :raises ValueError: If the state is malformed or its part layout does not
+            match the one computed by `part_gen` for the recorded file size
+        """
+        try:
+            etag = cls(state["file_size"], part_gen=part_gen)
+            part_digests = state["part_digests"]
+            if state["part_qty"] != etag.part_qty or len(part_digests) != etag.part_qty:
+                raise ValueError(
+                    f"State has {state['part_qty']} parts, but a file of size"
+                    f" {state['file_size']} has {etag.part_qty} parts"
+                )
+            for i, d in enumerate(part_digests):
+                if d is not None:
+                    etag._set_digest(i, bytes.fromhex(d))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed DandiETag state: {e}") from e
+        etag._update_index()
+        return etag
+
+    def _get_digest(self, i: int) -> Optional[bytes]:
+        if not self._have_digest[i]:
+            return None
+        return bytes(
+            self._md5_digests[i * self.DIGEST_SIZE : (i + 1) * self.DIGEST_SIZE]
+        )
+
+    def _set_digest(self, i: int, part_digest: bytes) -> None:
+        if len(part_digest) != self.DIGEST_SIZE:
+            raise ValueError(
+                f"Part digest must be {self.DIGEST_SIZE} bytes long;"
+                f" got {len(part_digest)}"
+            )
+        self._md5_digests[i * self.DIGEST_SIZE : (i + 1) * self.DIGEST_SIZE] = (
+            part_digest
+        )
+        self._have_digest[i] = 1
+
     def _add_digest(self, p: Part, part_digest: bytes) -> None:
         i = p.number - 1
-        if self._md5_digests[i] is not None:
+        if self._have_digest[i]:
             raise RuntimeError(f"Digest for part {p.number} submitted more than once")
-        self._md5_digests[i] = part_digest
+        self._set_digest(i, part_digest)
         self._update_index()
 
     def _add_next_digest(self, part_digest: bytes) -> None:
@@ -162,19 +346,16 @@ class DandiETag:
                 "Trying to update DandiETag with a new digest having already"
                 f" processed all {self.part_qty} parts"
             )
-        self._md5_digests[self._next_index] = part_digest
+        self._set_digest(self._next_index, part_digest)
         self._update_index()
 
     def _update_index(self) -> None:
-        while (
-            self._next_index < self.part_qty
-            and self._md5_digests[self._next_index] is not None
-        ):
+        while self._next_index < self.part_qty and self._have_digest[self._next_index]:
             self._next_index += 1
 
     def update(self, block: bytes, part: Optional[Part] = None) -> None:
         """Update etag with the new block of data"""
-        if self._partial_blob:
+        if self._partial_size:
             raise ValueError("Digesting new part when current part is not complete")
         part_digest = md5(block).digest()
         if part is None:
@@ -183,15 +364,64 @@ class DandiETag:
             self._add_digest(part, part_digest)
 
     def partial_update(self, block: bytes) -> None:
-        self._partial_blob += block
-        p = self.get_next_part()
-        while p is not None and p.size <= len(self._partial_blob):
-            next_block = self._partial_blob[: p.size]
-            self._partial_blob = self._partial_blob[p.size :]
-            self._add_next_digest(md5(next_block).digest())
+        """
+        Update etag with the next block of data, which need not be aligned with
+        part boundaries
+        """
+        view = memoryview(block)
+        pos = 0
+        while pos < len(view):
             p = self.get_next_part()
-        if p is None and self._partial_blob:
-            raise ValueError("Partial update extended past end of file")
+            if p is None:
+                raise ValueError("Partial update extended past end of file")
+            n = min(p.size - self._partial_size, len(view) - pos)
+            self._partial_md5.update(view[pos : pos + n])
+            self._partial_size += n
+            pos += n
+            if self._partial_size == p.size:
+                self._add_next_digest(self._partial_md5.digest())
+                self._partial_md5 = md5()
+                self._partial_size = 0
+
+
+def _digest_file_part(
+    path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
+    part: Part,
+    chunk_size: int,
+) -> bytes:
+    """Read the given part of a file at its offset and return its MD5 digest"""
+    # Each call uses its own file object so that concurrent calls do not share
+    # a file position
+    with open(path, "rb") as f:
+        f.seek(part.offset)
+        return _md5_digest_read(f, part, bytearray(min(chunk_size, part.size)), path)
+
+
+def _md5_digest_read(
+    f: io.BufferedIOBase,
+    part: Part,
+    buf: bytearray,
+    path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
+) -> bytes:
+    """
+    Read a part of a file from the current position of `f` and return its MD5
+    digest, reading at most ``len(buf)`` bytes at a time into `buf`
+    """
+    hasher = md5()
+    remaining = part.size
+    with memoryview(buf) as view:
+        while remaining:
+            with view[: min(remaining, len(view))] as target:
+                n = f.readinto(target)
+            if not n:
+                raise RuntimeError(
+                    f"Read {part.size - remaining} bytes for part {part.number} of"
+                    f" {path!r}; expected {part.size}"
+                )
+            with view[:n] as chunk:
+                hasher.update(chunk)
+            remaining -= n
+    return hasher.digest()
 
 
 class ETagHashlike:
@@ -205,3 +435,39 @@ class ETagHashlike:
 
     def hexdigest(self) -> str:
         return self.etagger.as_str()
+
+
+class AsyncETagHashlike:
+    """
+    Asynchronous counterpart of `ETagHashlike` that digests data in an executor so
+    that the event loop is not blocked while hashing
+
+    Updates are applied one at a time in the order they are made. Each `update()`
+    call completes only once its data has been digested, so a producer awaiting
+    it cannot get ahead of the hashing.
+    """
+
+    def __init__(self, file_size: int, executor: Optional[Executor] = None) -> None:
+        """
+        :param file_size: The size of the data to be digested
+        :param executor: The executor in which to digest the data. If `None`, the
+            event loop's default executor is used.
+        """
+        self.etagger: DandiETag = DandiETag(file_size)
+        self._executor = executor
+        self._lock = asyncio.Lock()
+
+    async def update(self, data: bytes) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._executor, self.etagger.partial_update, data
+            )
+
+    async def update_from(self, chunks: AsyncIterable[bytes]) -> None:
+        """Digest all data from an asynchronous iterable of byte chunks"""
+        async for chunk in chunks:
+            await self.update(chunk)
+
+    def hexdigest(self) -> str:
+        return self.etagger.as_str()
@@ -0,0 +1,85 @@
+"""
+Computation of multiple digests of a file in a single pass over its content
+"""
+
+import hashlib
+import os
+from typing import Any, Callable, Dict, Iterable, Union
+
+from .dandietag import ETagHashlike
+from ..models import DigestType
+
+# Factories of hashlib-compatible objects for the digest types that can be computed
+# from a file's content, given the size of the file
+_HASHER_FACTORIES: Dict[DigestType, Callable[[int], Any]] = {
+    DigestType.md5: lambda _size: hashlib.md5(),
+    DigestType.sha1: lambda _size: hashlib.sha1(),
+    DigestType.sha2_256: lambda _size: hashlib.sha256(),
+    DigestType.sha3_256: lambda _size: hashlib.sha3_256(),
+    DigestType.blake2b_256: lambda _size: hashlib.blake2b(digest_size=32),
+    DigestType.dandi_etag: ETagHashlike,
+}
+
+#: The digest types that `MultiDigester` and `get_digests()` support
+SUPPORTED_DIGEST_TYPES = frozenset(_HASHER_FACTORIES)
+
+#: The default size of the blocks in which `get_digests()` reads a file
+DEFAULT_CHUNK_SIZE = 2**20
+
+
+class MultiDigester:
+    """
+    A hashlib-like object that computes digests of multiple types for the same
+    data, which is fed to it once through `update()`
+    """
+
+    def __init__(self, file_size: int, digest_types: Iterable[DigestType]) -> None:
+        """
+        :param file_size: The total size of the data to be digested
+        :param digest_types: The types of the digests to compute
+        :raises ValueError: If any of the digest types is not supported
+        """
+        self._hashers: Dict[DigestType, Any] = {}
+        for dt in digest_types:
+            if dt not in _HASHER_FACTORIES:
+                raise ValueError(f"Unsupported digest type: {dt.value}")
+            if dt not in self._hashers:
+                self._hashers[dt] = _HASHER_FACTORIES[dt](file_size)
+        if not self._hashers:
+            raise ValueError("At least one digest type must be specified")
+
+    def update(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        for hasher in self._hashers.values():
+            hasher.update(data)
+
+    def digests(self) -> Dict[DigestType, str]:
+        """
+        Get the computed digests in the form expected by the `digest` field of
+        `BareAsset`
+        """
+        return {dt: hasher.hexdigest() for dt, hasher in self._hashers.items()}
+
+
+def get_digests(
+    path: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
+    digest_types: Iterable[DigestType] = (DigestType.dandi_etag, DigestType.sha2_256),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[DigestType, str]:
+    """
+    Compute digests of multiple types of a file while reading the file only once
+
+    :param path: The path of the file to digest
+    :param digest_types: The types of the digests to compute. Defaults to the
+        types required for a published asset.
+    :param chunk_size: The size of the blocks in which the file is read
+    :return: A mapping of the digest types to the digests of the file, usable as
+        the `digest` field of `BareAsset`
+    :raises ValueError: If any of the digest types is not supported
+    """
+    digester = MultiDigester(os.path.getsize(path), digest_types)
+    buf = bytearray(chunk_size)
+    with open(path, "rb") as f, memoryview(buf) as view:
+        while n := f.readinto(buf):
+            with view[:n] as chunk:
+                digester.update(chunk)
+    return digester.digests()
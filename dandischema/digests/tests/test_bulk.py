@@ -0,0 +1,144 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ..bulk import DigestCache, digest_tree, main
+from ..dandietag import DandiETag
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "tree"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.txt").write_bytes(b"123")
+    (root / "sub" / "b.dat").write_bytes(b"\0")
+    return root
+
+
+def test_digest_tree_cache(
+    tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_file = tmp_path / "cache.json"
+    cache = DigestCache(cache_file)
+    digests = digest_tree(tree, cache=cache, max_workers=2)
+    cache.save()
+    assert digests == {
+        tree / "a.txt": "d022646351048ac0ba397d12dfafa304-1",
+        tree / "sub" / "b.dat": "7e4696ef25d5faececd853ce5e2a233b-1",
+    }
+
+    digested: list[Path] = []
+    from_file = DandiETag.from_file
+
+    def spy(path: Path) -> DandiETag:
+        digested.append(path)
+        return from_file(path)
+
+    monkeypatch.setattr(DandiETag, "from_file", spy)
+    (tree / "c.txt").write_bytes(b"123")
+    st = (tree / "a.txt").stat()
+    (tree / "a.txt").write_bytes(b"\0")
+    os.utime(tree / "a.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    digests = digest_tree(tree, cache=DigestCache(cache_file))
+    assert sorted(digested) == [tree / "a.txt", tree / "c.txt"]
+    assert digests == {
+        tree / "a.txt": "7e4696ef25d5faececd853ce5e2a233b-1",
+        tree / "c.txt": "d022646351048ac0ba397d12dfafa304-1",
+        tree / "sub" / "b.dat": "7e4696ef25d5faececd853ce5e2a233b-1",
+    }
+
+
+def test_main(tree: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    cache_file = tmp_path / "cache.json"
+    assert main([str(tree), "--cache", str(cache_file), "-j", "2"]) == 0
+    assert cache_file.exists()
+    assert capsys.readouterr().out == (
+        "d022646351048ac0ba397d12dfafa304-1  a.txt\n"
+        "7e4696ef25d5faececd853ce5e2a233b-1  sub/b.dat\n"
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="FIFOs are not supported")
+def test_digest_tree_skips_fifo(tree: Path) -> None:
+    os.mkfifo(tree / "fifo")
+    assert set(digest_tree(tree)) == {tree / "a.txt", tree / "sub" / "b.dat"}
+
+
+def test_digest_tree_skips_broken_symlink(
+    tree: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    try:
+        (tree / "broken").symlink_to(tree / "nonexistent")
+    except OSError:
+        pytest.skip("Symbolic links cannot be created")
+    cache = DigestCache()
+    assert set(digest_tree(tree, cache=cache)) == {
+        tree / "a.txt",
+        tree / "sub" / "b.dat",
+    }
+    assert cache.get(tree / "a.txt", (tree / "a.txt").stat()) is not None
+    assert "broken" in caplog.text
+
+
+def test_digest_tree_skips_unreadable_file(
+    tree: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    from_file = DandiETag.from_file
+
+    def from_file_failing(path: Path) -> DandiETag:
+        if path.name == "a.txt":
+            raise PermissionError(f"Permission denied: {path}")
+        return from_file(path)
+
+    monkeypatch.setattr(DandiETag, "from_file", from_file_failing)
+    cache = DigestCache()
+    assert set(digest_tree(tree, cache=cache)) == {tree / "sub" / "b.dat"}
+    assert cache.get(tree / "a.txt", (tree / "a.txt").stat()) is None
+    assert "Permission denied" in caplog.text
+
+
+def test_digest_cache_relative_paths(
+    tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.chdir(tree)
+    cache = DigestCache(cache_file)
+    assert digest_tree(".", cache=cache) == {
+        Path("a.txt"): "d022646351048ac0ba397d12dfafa304-1",
+        Path("sub", "b.dat"): "7e4696ef25d5faececd853ce5e2a233b-1",
+    }
+    cache.save()
+    assert sorted(DigestCache(cache_file)._entries) == [
+        str((tree / "a.txt").resolve()),
+        str((tree / "sub" / "b.dat").resolve()),
+    ]
+
+    # The cached digests are found when the tree is given differently from a
+    # different working directory
+    monkeypatch.chdir(tmp_path)
+
+    def fail(path: Path) -> DandiETag:
+        raise AssertionError(f"{path} digested")
+
+    monkeypatch.setattr(DandiETag, "from_file", fail)
+    assert set(digest_tree(tree.name, cache=DigestCache(cache_file))) == {
+        Path(tree.name, "a.txt"),
+        Path(tree.name, "sub", "b.dat"),
+    }
+
+
+def test_digest_cache_save_temporary_file(tree: Path, tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.json"
+    # A temporary file of another process's concurrent save is left alone
+    other_tmp = tmp_path / "cache.json.tmp"
+    other_tmp.write_text("{}")
+    cache = DigestCache(cache_file)
+    digest_tree(tree, cache=cache)
+    cache.save()
+    assert other_tmp.read_text() == "{}"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "cache.json",
+        "cache.json.tmp",
+        "tree",
+    ]
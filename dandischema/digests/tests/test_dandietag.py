@@ -1,9 +1,23 @@
+import asyncio
+from hashlib import md5
+import json
 from pathlib import Path
 import re
+import tracemalloc
+from typing import AsyncIterator, Optional
 
 import pytest
 
-from ..dandietag import DandiETag, ETagHashlike, Part, PartGenerator, mb, tb
+from ..dandietag import (
+    AsyncETagHashlike,
+    DandiETag,
+    ETagHashlike,
+    Part,
+    PartGenerator,
+    PartPlan,
+    mb,
+    tb,
+)
 
 
 @pytest.mark.parametrize(
@@ -47,6 +61,21 @@ def test_part_generator(
         pg[-1]
 
 
+def test_part_generator_for_file_sizes() -> None:
+    sizes = [mb(140), 0, 1, tb(5)]
+    plan = PartGenerator.for_file_sizes(sizes)
+    assert isinstance(plan, PartPlan)
+    assert list(plan.part_qty) == [3, 0, 1, 10000]
+    assert list(plan.part_start) == [0, 3, 3, 4, 10004]
+    for i, file_size in enumerate(sizes):
+        lo, hi = plan.part_start[i], plan.part_start[i + 1]
+        assert list(plan.file_index[lo:hi]) == [i] * (hi - lo)
+        assert [
+            Part(*p)
+            for p in zip(plan.number[lo:hi], plan.offset[lo:hi], plan.size[lo:hi])
+        ] == list(PartGenerator.for_file_size(file_size))
+
+
 def test_part_generator_too_large() -> None:
     with pytest.raises(ValueError) as excinfo:
         PartGenerator.for_file_size(tb(5) + 1)
@@ -137,3 +166,144 @@ def test_etaghashlike() -> None:
     for sz in sizes:
         hasher.update(b"\0" * sz)
     assert hasher.hexdigest() == "4dc80858c50371577551592f20ac0075-3"
+
+
+@pytest.mark.parametrize("max_workers", [None, 1, 4])
+def test_dandietag_from_file_workers(
+    tmp_path: Path, max_workers: Optional[int]
+) -> None:
+    f = tmp_path / "sample.dat"
+    with f.open("wb") as fp:
+        fp.truncate(mb(130))
+    etagger = DandiETag.from_file(f, max_workers=max_workers)
+    assert etagger.complete
+    assert etagger.as_str() == "4dc80858c50371577551592f20ac0075-3"
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_dandietag_from_file_content(
+    tmp_path: Path, max_workers: Optional[int]
+) -> None:
+    f = tmp_path / "sample.dat"
+    data = bytes(range(256)) * (mb(70) // 256) + b"tail"
+    f.write_bytes(data)
+    part_digests = b"".join(
+        md5(data[p.offset : p.offset + p.size]).digest()
+        for p in PartGenerator.for_file_size(len(data))
+    )
+    etagger = DandiETag.from_file(f, max_workers=max_workers)
+    assert etagger.as_str() == f"{md5(part_digests).hexdigest()}-2"
+
+
+@pytest.mark.parametrize(
+    "content, etag",
+    [
+        (b"", "d41d8cd98f00b204e9800998ecf8427e-0"),
+        (b"123", "d022646351048ac0ba397d12dfafa304-1"),
+    ],
+)
+def test_dandietag_from_file_small(tmp_path: Path, content: bytes, etag: str) -> None:
+    f = tmp_path / "sample.dat"
+    f.write_bytes(content)
+    assert DandiETag.from_file(f).as_str() == etag
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_dandietag_from_file_memory_bound(
+    tmp_path: Path, max_workers: Optional[int]
+) -> None:
+    # Parts of the file are 64 MB and 6 MB, yet no more than a few read buffers
+    # are to be allocated at a time
+    f = tmp_path / "sample.dat"
+    with f.open("wb") as fp:
+        fp.truncate(mb(70))
+    tracemalloc.start()
+    try:
+        etagger = DandiETag.from_file(f, max_workers=max_workers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert etagger.as_str().endswith("-2")
+    assert peak < 4 * DandiETag.READ_CHUNK_SIZE
+
+
+def test_partial_update_unaligned() -> None:
+    etagger = DandiETag(mb(130))
+    remaining = mb(130)
+    chunk_size = 65_537
+    while remaining:
+        n = min(chunk_size, remaining)
+        etagger.partial_update(b"\0" * n)
+        remaining -= n
+    assert etagger.as_str() == "4dc80858c50371577551592f20ac0075-3"
+
+
+def test_partial_update_past_end() -> None:
+    etagger = DandiETag(3)
+    etagger.partial_update(b"12")
+    with pytest.raises(ValueError) as excinfo:
+        etagger.partial_update(b"34")
+    assert str(excinfo.value) == "Partial update extended past end of file"
+    assert etagger.as_str() == "d022646351048ac0ba397d12dfafa304-1"
+
+
+def test_update_during_partial_part() -> None:
+    etagger = DandiETag(mb(140))
+    etagger.partial_update(b"\0" * 10)
+    with pytest.raises(ValueError) as excinfo:
+        etagger.update(b"\0" * mb(64), part=etagger.get_part(2))
+    assert str(excinfo.value) == "Digesting new part when current part is not complete"
+
+
+def test_dandietag_state_roundtrip() -> None:
+    etagger = DandiETag(mb(640))
+    pieces = list(zip(etagger.get_parts(), PART_DIGESTS))
+    for p, d in pieces[:4] + pieces[6:7]:
+        etagger._add_digest(p, d)
+    etagger.partial_update(b"\0" * 10)
+    state = json.loads(json.dumps(etagger.get_state()))
+    assert state["file_size"] == mb(640)
+    assert state["part_qty"] == 10
+    resumed = DandiETag.from_state(state)
+    assert resumed.get_next_part() == etagger.get_part(5)
+    assert resumed.get_part_etag(etagger.get_part(7)) == PART_DIGESTS[6].hex()
+    for p, d in pieces[4:6] + pieces[7:]:
+        resumed._add_digest(p, d)
+    assert resumed.as_str() == ETAG
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {},
+        {"file_size": mb(640), "part_qty": 10, "part_digests": [None] * 9},
+        {"file_size": mb(640), "part_qty": 9, "part_digests": [None] * 9},
+        {"file_size": mb(640), "part_qty": 10, "part_digests": [1] * 10},
+        {"file_size": mb(640), "part_qty": 10, "part_digests": ["00"] * 10},
+    ],
+)
+def test_dandietag_from_state_malformed(state: dict) -> None:
+    with pytest.raises(ValueError):
+        DandiETag.from_state(state)
+
+
+def test_async_etaghashlike() -> None:
+    sizes = [mb(20), mb(30), mb(75), mb(5)]
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for sz in sizes:
+            yield b"\0" * sz
+
+    async def digest() -> str:
+        hasher = AsyncETagHashlike(sum(sizes))
+        await hasher.update_from(chunks())
+        return hasher.hexdigest()
+
+    assert asyncio.run(digest()) == "4dc80858c50371577551592f20ac0075-3"
+
+
+def test_dandietag_from_file_async(tmp_path: Path) -> None:
+    f = tmp_path / "sample.txt"
+    f.write_bytes(b"123")
+    etagger = asyncio.run(DandiETag.from_file_async(f))
+    assert etagger.as_str() == "d022646351048ac0ba397d12dfafa304-1"
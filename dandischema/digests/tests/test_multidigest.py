@@ -0,0 +1,49 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from ..dandietag import DandiETag, mb
+from ..multidigest import MultiDigester, get_digests
+from ...models import DigestType
+
+
+def test_get_digests(tmp_path: Path) -> None:
+    f = tmp_path / "sample.dat"
+    data = bytes(range(256)) * (mb(70) // 256)
+    f.write_bytes(data)
+    digests = get_digests(
+        f,
+        [
+            DigestType.dandi_etag,
+            DigestType.sha2_256,
+            DigestType.md5,
+            DigestType.sha1,
+            DigestType.blake2b_256,
+        ],
+        chunk_size=mb(3),
+    )
+    assert digests == {
+        DigestType.dandi_etag: DandiETag.from_file(f).as_str(),
+        DigestType.sha2_256: hashlib.sha256(data).hexdigest(),
+        DigestType.md5: hashlib.md5(data).hexdigest(),
+        DigestType.sha1: hashlib.sha1(data).hexdigest(),
+        DigestType.blake2b_256: hashlib.blake2b(data, digest_size=32).hexdigest(),
+    }
+
+
+def test_get_digests_default(tmp_path: Path) -> None:
+    f = tmp_path / "sample.txt"
+    f.write_bytes(b"123")
+    assert get_digests(f) == {
+        DigestType.dandi_etag: "d022646351048ac0ba397d12dfafa304-1",
+        DigestType.sha2_256: hashlib.sha256(b"123").hexdigest(),
+    }
+
+
+@pytest.mark.parametrize(
+    "digest_types", [[], [DigestType.dandi_zarr_checksum], [DigestType.blake3]]
+)
+def test_multidigester_unsupported(digest_types: list[DigestType]) -> None:
+    with pytest.raises(ValueError):
+        MultiDigester(3, digest_types)
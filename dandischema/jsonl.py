@@ -0,0 +1,165 @@
+"""
+Streaming validation of metadata records in JSON Lines (NDJSON) format
+
+Records are read and validated incrementally, in chunks, so memory use does not
+depend on the size of the input. For each input line holding a record, a compact
+JSON result line is produced.
+
+Can also be run as a script::
+
+    python -m dandischema.jsonl [--schema-version VERSION] [--schema-key KEY] \\
+        [--json-validation] [-o OUTPUT] [INPUT]
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import ExitStack
+from itertools import islice
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+from .exceptions import JsonschemaValidationError, PydanticValidationError
+from .metadata import validate_many
+
+
+def iter_validate_jsonl(
+    lines: Iterable[str],
+    schema_version: Optional[str] = None,
+    schema_key: Optional[str] = None,
+    json_validation: bool = False,
+    chunksize: int = 100,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Validate the records in lines of JSON Lines input
+
+    :param lines: The input lines. Blank lines are skipped.
+    :param schema_version: The schema version to validate all records against.
+        See `dandischema.metadata.validate()`.
+    :param schema_key: The schema key to use for all records.
+        See `dandischema.metadata.validate()`.
+    :param json_validation: Whether to validate each record against the
+        corresponding JSON schema first
+    :param chunksize: The number of records validated together, sharing validators
+    :return: An iterator of the results of the records, in input order. Each result
+        is a `dict` with the (1-based) ``line`` number of the record and whether it
+        is ``valid``; the result of an invalid record also has a list of ``errors``
+        messages.
+    """
+    numbered = ((i, line) for i, line in enumerate(lines, start=1) if line.strip())
+    while chunk := list(islice(numbered, chunksize)):
+        parsed: List[Any] = []
+        for _, line in chunk:
+            try:
+                parsed.append(json.loads(line))
+            except ValueError as e:
+                parsed.append(ValueError(f"Invalid JSON: {e}"))
+        records = [r for r in parsed if isinstance(r, dict)]
+        results = iter(
+            validate_many(
+                records,
+                schema_version=schema_version,
+                schema_key=schema_key,
+                json_validation=json_validation,
+            )
+        )
+        for (lineno, _), r in zip(chunk, parsed):
+            if isinstance(r, dict):
+                err = next(results)
+            elif isinstance(r, ValueError):
+                err = r
+            else:
+                err = ValueError("Record is not a JSON object")
+            if err is None:
+                yield {"line": lineno, "valid": True}
+            else:
+                yield {"line": lineno, "valid": False, "errors": _error_messages(err)}
+
+
+def validate_jsonl(
+    infile: TextIO,
+    outfile: TextIO,
+    schema_version: Optional[str] = None,
+    schema_key: Optional[str] = None,
+    json_validation: bool = False,
+) -> int:
+    """
+    Validate the records in a JSON Lines stream, writing a JSON result line for each
+    record to another stream
+
+    See `iter_validate_jsonl()` for the parameters and the format of the results.
+
+    :return: The number of invalid records
+    """
+    n_invalid = 0
+    for result in iter_validate_jsonl(
+        infile,
+        schema_version=schema_version,
+        schema_key=schema_key,
+        json_validation=json_validation,
+    ):
+        n_invalid += not result["valid"]
+        outfile.write(json.dumps(result, separators=(",", ":")) + "\n")
+    return n_invalid
+
+
+def _error_messages(err: ValueError) -> List[str]:
+    if isinstance(err, PydanticValidationError):
+        return [
+            f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+            for e in err.errors
+        ]
+    if isinstance(err, JsonschemaValidationError):
+        return [f"{e.json_path}: {e.message}" for e in err.errors]
+    return [str(err)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m dandischema.jsonl",
+        description="Validate DANDI metadata records in JSON Lines format",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help='JSON Lines file to validate; "-", the default, for standard input',
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help='File to write the results to; "-", the default, for standard output',
+    )
+    parser.add_argument("--schema-version", help="Schema version to validate against")
+    parser.add_argument("--schema-key", help="Schema key to validate against")
+    parser.add_argument(
+        "--json-validation",
+        action="store_true",
+        help="Also validate the records against the JSON schemas",
+    )
+    args = parser.parse_args(argv)
+    with ExitStack() as stack:
+        infile = (
+            sys.stdin
+            if args.input == "-"
+            else stack.enter_context(open(args.input, encoding="utf-8"))
+        )
+        outfile = (
+            sys.stdout
+            if args.output == "-"
+            else stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        )
+        n_invalid = validate_jsonl(
+            infile,
+            outfile,
+            schema_version=args.schema_version,
+            schema_key=args.schema_key,
+            json_validation=args.json_validation,
+        )
+    return 1 if n_invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,44 @@
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from copy import deepcopy
 from enum import Enum
 from functools import cache
+from hashlib import sha256
 from inspect import isclass
+from itertools import islice
 import json
+import logging
+import multiprocessing
+import os
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, TypeVar, Union, cast, get_args
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+    get_args,
+)
 
 from jsonschema.protocols import Validator as JsonschemaValidator
 import pydantic
 import requests
 
+from .conf import get_instance_config
 from .consts import (
     ALLOWED_INPUT_SCHEMAS,
     ALLOWED_TARGET_SCHEMAS,
     ALLOWED_VALIDATION_SCHEMAS,
     DANDI_SCHEMA_VERSION,
 )
-from .exceptions import PydanticValidationError
-from . import models
+from .exceptions import JsonschemaValidationError, PydanticValidationError
+from . import _validation_worker, models
 from .utils import (
     TransitionalGenerateJsonSchema,
     _ensure_newline,
@@ -29,6 +50,8 @@ from .utils import (
     version2tuple,
 )
 
+logger = logging.getLogger(__name__)
+
 # A mapping of the schema keys of DANDI models to the names of their JSON schema files
 SCHEMA_MAP = {
     "Dandiset": "dandiset.json",
@@ -37,8 +60,66 @@ SCHEMA_MAP = {
     "PublishedAsset": "published-asset.json",
 }
 
+# The environment variable specifying the directory of the local store of released
+# DANDI JSON schemas
+SCHEMA_STORE_ENV_VAR = "DANDI_SCHEMA_STORE"
+
+# The environment variable specifying the directory in which JSON schemas generated
+# from the DANDI models are cached across processes
+SCHEMA_CACHE_ENV_VAR = "DANDI_SCHEMA_CACHE"
+
+
+class ContextArtifact(NamedTuple):
+    """The JSON-LD context of the DANDI models serialized for serving"""
+
+    #: The UTF-8 encoded JSON of the context
+    content: bytes
+    #: An entity tag of the content, suitable for an HTTP ``ETag`` header once
+    #: quoted
+    etag: str
+
 
 def generate_context() -> dict:
+    """
+    Generate the JSON-LD context of the DANDI models
+
+    The context is computed once per DANDI schema version and DANDI instance
+    configuration, and a copy of it is returned on each call.
+    """
+    return deepcopy(_generate_context_cached(*_context_cache_key()))
+
+
+def get_context_artifact() -> ContextArtifact:
+    """
+    Get the JSON-LD context of the DANDI models, as returned by `generate_context()`,
+    pre-serialized along with an entity tag
+
+    The artifact is computed once per DANDI schema version and DANDI instance
+    configuration.
+    """
+    return _get_context_artifact_cached(*_context_cache_key())
+
+
+def _context_cache_key() -> Tuple[str, str]:
+    return models.get_schema_version(), get_instance_config().model_dump_json()
+
+
+@cache
+def _get_context_artifact_cached(
+    schema_version: str, instance_config_json: str
+) -> ContextArtifact:
+    content = _ensure_newline(
+        json.dumps(
+            _generate_context_cached(schema_version, instance_config_json), indent=2
+        )
+    ).encode("utf-8")
+    return ContextArtifact(content=content, etag=sha256(content).hexdigest())
+
+
+@cache
+def _generate_context_cached(schema_version: str, instance_config_json: str) -> dict:
+    # The arguments are only the cache key; the context is generated from the
+    # models as currently defined
     import pydantic
 
     field_preamble = {
@@ -136,14 +217,7 @@ def publish_model_schemata(releasedir: Union[str, Path]) -> Path:
     vdir.mkdir(exist_ok=True, parents=True)
     for class_, filename in SCHEMA_MAP.items():
         (vdir / filename).write_text(
-            _ensure_newline(
-                json.dumps(
-                    getattr(models, class_).model_json_schema(
-                        schema_generator=TransitionalGenerateJsonSchema
-                    ),
-                    indent=2,
-                )
-            )
+            _ensure_newline(json.dumps(_get_model_json_schema(class_), indent=2))
         )
     (vdir / "context.json").write_text(
         _ensure_newline(json.dumps(generate_context(), indent=2))
@@ -151,16 +225,138 @@ def publish_model_schemata(releasedir: Union[str, Path]) -> Path:
     return vdir
 
 
-def _validate_dandiset_json(data: dict, schema_dir: Union[str, Path]) -> None:
-    with Path(schema_dir, "dandiset.json").open() as fp:
+# The validators for the JSON schema files in schema directories, keyed by the
+# absolute paths of the files, along with the modification times and sizes of the
+# files when they were read
+_schema_file_validators: Dict[str, Tuple[int, int, JsonschemaValidator]] = {}
+
+
+def _get_schema_file_validator(
+    schema_dir: Union[str, Path], filename: str
+) -> JsonschemaValidator:
+    """
+    Get the validator for a JSON schema file in a schema directory, reading and
+    parsing the file only if it has not been read before or has been modified since
+    it was last read
+    """
+    path = os.path.abspath(Path(schema_dir, filename))
+    st = os.stat(path)
+    cached = _schema_file_validators.get(path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    with open(path) as fp:
         schema = json.load(fp)
-    validate_json(data, dandi_jsonschema_validator(schema))
+    validator = dandi_jsonschema_validator(schema)
+    _schema_file_validators[path] = (st.st_mtime_ns, st.st_size, validator)
+    return validator
+
+
+def _validate_json_many(
+    objs: Iterable[dict], validator: JsonschemaValidator
+) -> List[Optional[JsonschemaValidationError]]:
+    results: List[Optional[JsonschemaValidationError]] = []
+    for obj in objs:
+        try:
+            validate_json(obj, validator)
+        except JsonschemaValidationError as e:
+            results.append(e)
+        else:
+            results.append(None)
+    return results
+
+
+def _validate_dandiset_json(data: dict, schema_dir: Union[str, Path]) -> None:
+    validate_json(data, _get_schema_file_validator(schema_dir, "dandiset.json"))
 
 
 def _validate_asset_json(data: dict, schema_dir: Union[str, Path]) -> None:
-    with Path(schema_dir, "asset.json").open() as fp:
-        schema = json.load(fp)
-    validate_json(data, dandi_jsonschema_validator(schema))
+    validate_json(data, _get_schema_file_validator(schema_dir, "asset.json"))
+
+
+def _validate_dandisets_json(
+    objs: Iterable[dict], schema_dir: Union[str, Path]
+) -> List[Optional[JsonschemaValidationError]]:
+    """
+    Validate multiple Dandiset metadata instances against the ``dandiset.json``
+    schema in a schema directory
+
+    :return: The error of each instance, in the order of the instances, or `None`
+        for each valid instance
+    """
+    return _validate_json_many(
+        objs, _get_schema_file_validator(schema_dir, "dandiset.json")
+    )
+
+
+def _validate_assets_json(
+    objs: Iterable[dict], schema_dir: Union[str, Path]
+) -> List[Optional[JsonschemaValidationError]]:
+    """
+    Validate multiple asset metadata instances against the ``asset.json`` schema in
+    a schema directory
+
+    :return: The error of each instance, in the order of the instances, or `None`
+        for each valid instance
+    """
+    return _validate_json_many(
+        objs, _get_schema_file_validator(schema_dir, "asset.json")
+    )
+
+
+def get_schema_store_dir() -> Optional[Path]:
+    """
+    Get the directory of the local store of released DANDI JSON schemas, which is
+    specified by the `DANDI_SCHEMA_STORE` environment variable
+
+    The store has the same layout as the `releases` directory of the `dandi/schema`
+    repository, i.e., ``<store>/<schema version>/<schema file>``, and, as such, can
+    be populated by copying that directory or by calling `populate_schema_store()`.
+
+    :return: The path of the schema store directory, or `None` if the environment
+        variable is unset or empty
+    """
+    store = os.environ.get(SCHEMA_STORE_ENV_VAR)
+    return Path(store) if store else None
+
+
+def populate_schema_store(
+    store_dir: Union[str, Path], schema_versions: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Download released DANDI JSON schemas from the `dandi/schema` repository into a
+    local schema store
+
+    :param store_dir: The directory of the schema store
+    :param schema_versions: The schema versions to download the schemas of.
+        Defaults to all the versions in `ALLOWED_VALIDATION_SCHEMAS` except the
+        current one, whose schemas are generated locally.
+    :raises requests.HTTPError: If a schema cannot be fetched
+    """
+    if schema_versions is None:
+        schema_versions = [
+            v for v in ALLOWED_VALIDATION_SCHEMAS if v != DANDI_SCHEMA_VERSION
+        ]
+    for schema_version in schema_versions:
+        for schema_key, filename in SCHEMA_MAP.items():
+            r = requests.get(_schema_url(schema_version, schema_key))
+            r.raise_for_status()
+            _write_schema_file(Path(store_dir, schema_version, filename), r.json())
+
+
+def _schema_url(schema_version: str, schema_key: str) -> str:
+    return (
+        f"https://raw.githubusercontent.com/dandi/schema/"
+        f"master/releases/{schema_version}/{SCHEMA_MAP[schema_key]}"
+    )
+
+
+def _write_schema_file(path: Path, schema: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written schema
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(_ensure_newline(json.dumps(schema, indent=2)))
+    os.replace(tmp, path)
 
 
 @cache
@@ -177,9 +373,15 @@ def _get_jsonschema_validator(
     :raises ValueError: If the provided schema version is among the allowed versions,
         `ALLOWED_VALIDATION_SCHEMAS`
     :raises ValueError: If the provided schema key is not among the keys in `SCHEMA_MAP`
-    :raises requests.HTTPError: If the schema cannot be fetched from the `dandi/schema`
-        repository
-    :raises RuntimeError: If the fetched schema is not a valid JSON object
+    :raises requests.HTTPError: If the schema is not in the local schema store and
+        cannot be fetched from the `dandi/schema` repository
+    :raises RuntimeError: If the obtained schema is not a valid JSON object
+
+    Note
+    ----
+        If a local schema store is configured (see `get_schema_store_dir()`), the
+        schema is loaded from it if present there, and a schema fetched from the
+        `dandi/schema` repository is saved to it if possible.
     """
     if schema_version not in ALLOWED_VALIDATION_SCHEMAS:
         raise ValueError(
@@ -191,14 +393,23 @@ def _get_jsonschema_validator(
             f"Schema key must be one of {', '.join(map(repr, SCHEMA_MAP.keys()))}"
         )
 
-    # Fetch the schema from the `dandi/schema` repository
-    schema_url = (
-        f"https://raw.githubusercontent.com/dandi/schema/"
-        f"master/releases/{schema_version}/{SCHEMA_MAP[schema_key]}"
+    store = get_schema_store_dir()
+    stored_schema_path = (
+        store / schema_version / SCHEMA_MAP[schema_key] if store is not None else None
     )
-    r = requests.get(schema_url)
-    r.raise_for_status()
-    schema = r.json()
+    if stored_schema_path is not None and stored_schema_path.is_file():
+        # Load the schema from the local schema store
+        fetched = False
+        schema_src = str(stored_schema_path)
+        with stored_schema_path.open() as fp:
+            schema = json.load(fp)
+    else:
+        # Fetch the schema from the `dandi/schema` repository
+        fetched = True
+        schema_src = _schema_url(schema_version, schema_key)
+        r = requests.get(schema_src)
+        r.raise_for_status()
+        schema = r.json()
 
     # Validate that the retrieved schema is a valid JSON object, i.e., a dictionary
     # This step is needed because the `jsonschema` package requires the schema to be a
@@ -207,11 +418,22 @@ def _get_jsonschema_validator(
         json_object_adapter.validate_python(schema)
     except pydantic.ValidationError as e:
         msg = (
-            f"The JSON schema at {schema_url} is not a valid JSON object. "
+            f"The JSON schema at {schema_src} is not a valid JSON object. "
             f"Received: {schema}"
         )
         raise RuntimeError(msg) from e
 
+    if fetched and stored_schema_path is not None:
+        # Save the fetched schema in the local schema store for future processes.
+        # The store may well be read-only, in which case the fetched schema is still
+        # used.
+        try:
+            _write_schema_file(stored_schema_path, schema)
+        except OSError as e:
+            logger.warning(
+                "Failed to save schema %s to the local schema store: %s", schema_src, e
+            )
+
     # Create a jsonschema validator for the schema
     return dandi_jsonschema_validator(schema)
 
@@ -230,12 +452,80 @@ def _get_jsonschema_validator_local(schema_key: str) -> JsonschemaValidator:
             f"Schema key must be one of {', '.join(map(repr, SCHEMA_MAP.keys()))}"
         )
 
-    # The pydantic model with the specified schema key
-    m: type[pydantic.BaseModel] = getattr(models, schema_key)
+    return dandi_jsonschema_validator(_get_model_json_schema(schema_key))
+
+
+def get_schema_cache_dir() -> Optional[Path]:
+    """
+    Get the directory in which the JSON schemas generated from the DANDI models
+    are cached across processes, which is specified by the `DANDI_SCHEMA_CACHE`
+    environment variable
+
+    :return: The path of the schema cache directory, or `None` if the environment
+        variable is unset or empty
+    """
+    cache_dir = os.environ.get(SCHEMA_CACHE_ENV_VAR)
+    return Path(cache_dir) if cache_dir else None
 
-    return dandi_jsonschema_validator(
-        m.model_json_schema(schema_generator=TransitionalGenerateJsonSchema)
+
+def _schema_fingerprint() -> str:
+    """
+    Get a fingerprint of everything the JSON schemas generated from the DANDI models
+    depend on besides the schema version
+    """
+    from . import __version__
+
+    return sha256(
+        json.dumps(
+            [
+                __version__,
+                pydantic.VERSION,
+                get_instance_config().model_dump(mode="json"),
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+@cache
+def _get_model_json_schema(schema_key: str) -> dict[str, Any]:
+    """
+    Get the JSON schema of the DANDI model with the given schema key, as published
+
+    The schema is generated at most once per process. If a schema cache directory is
+    configured (see `get_schema_cache_dir()`), a schema generated under the same
+    schema version and fingerprint (see `_schema_fingerprint()`) is loaded from it
+    instead, and a generated schema is saved to it if possible.
+
+    Note
+    ----
+        The returned schema is shared and must not be modified.
+    """
+    cache_dir = get_schema_cache_dir()
+    cached_schema_path = (
+        cache_dir
+        / models.get_schema_version()
+        / _schema_fingerprint()
+        / SCHEMA_MAP[schema_key]
+        if cache_dir is not None
+        else None
     )
+    if cached_schema_path is not None and cached_schema_path.is_file():
+        with cached_schema_path.open() as fp:
+            return cast(dict[str, Any], json.load(fp))
+
+    m: type[pydantic.BaseModel] = getattr(models, schema_key)
+    schema = m.model_json_schema(schema_generator=TransitionalGenerateJsonSchema)
+    if cached_schema_path is not None:
+        try:
+            _write_schema_file(cached_schema_path, schema)
+        except OSError as e:
+            logger.warning(
+                "Failed to save the schema of %s to the schema cache: %s",
+                schema_key,
+                e,
+            )
+    return schema
 
 
 def validate(
@@ -266,38 +556,232 @@ def validate(
      ------
      ValueError
        if no schema key is provided through `schema_key` or the `schemaKey`
-       attribute of the object, or if the schema version to validate against
-       is not an allowed one
+       attribute of the object, if the schema key is not that of a DANDI model,
+       or if the schema version to validate against is not an allowed one
      JsonschemaValidationError
        if `json_validation` is `True` and the object fails JSON schema validation
      PydanticValidationError
        if the object fails Pydantic validation
     """
+    schema_version, schema_key = _resolve_validation_target(
+        obj, schema_version, schema_key
+    )
+    if json_validation:
+        validate_json(
+            obj, _get_validation_jsonschema_validator(schema_version, schema_key)
+        )
+    try:
+        # Validate with the cached type adapter of the model, discarding the
+        # resulting model instance right away
+        _get_model_adapter(schema_key).validate_python(obj)
+    except pydantic.ValidationError as exc:
+        raise PydanticValidationError(exc.errors())  # type: ignore[arg-type]
+
+
+def validate_many(
+    objs: Iterable[dict],
+    schema_version: Optional[str] = None,
+    schema_key: Optional[str] = None,
+    json_validation: bool = False,
+) -> List[Optional[ValueError]]:
+    """Validate multiple objects, as `validate()` does, without raising
+
+    The objects are grouped by the schema version and schema key to validate them
+    against, and a single jsonschema validator and a single pydantic type adapter
+    are used for all the objects of a group.
+
+    Parameters
+    ----------
+    objs: Iterable[dict]
+      The objects to validate
+    schema_version: str, optional
+      Version of schema to validate all objects against.  See `validate()`.
+    schema_key: str, optional
+      Name of the schema key to be used for all objects.  See `validate()`.
+    json_validation: bool, optional
+      If set to True, each object is first validated against the corresponding
+      jsonschema.
+
+    Returns
+    -------
+    List[Optional[ValueError]]
+      For each object, in the order given, `None` if it is valid, or else the
+      exception `validate()` would have raised for it
+    """
+    objs = list(objs)
+    results: List[Optional[ValueError]] = [None] * len(objs)
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, obj in enumerate(objs):
+        try:
+            target = _resolve_validation_target(obj, schema_version, schema_key)
+        except ValueError as e:
+            results[i] = e
+        else:
+            groups.setdefault(target, []).append(i)
+    for (version, key), indices in groups.items():
+        try:
+            jvalidator = (
+                _get_validation_jsonschema_validator(version, key)
+                if json_validation
+                else None
+            )
+            adapter = _get_model_adapter(key)
+        except ValueError as e:
+            for i in indices:
+                results[i] = e
+            continue
+        for i in indices:
+            try:
+                if jvalidator is not None:
+                    validate_json(objs[i], jvalidator)
+                adapter.validate_python(objs[i])
+            except pydantic.ValidationError as exc:
+                results[i] = PydanticValidationError(
+                    exc.errors()  # type: ignore[arg-type]
+                )
+            except JsonschemaValidationError as e:
+                results[i] = e
+    return results
+
+
+def validate_parallel(
+    objs: Iterable[dict],
+    schema_version: Optional[str] = None,
+    schema_key: Optional[str] = None,
+    json_validation: bool = False,
+    max_workers: Optional[int] = None,
+    chunksize: int = 100,
+) -> Iterator[Optional[ValueError]]:
+    """Validate multiple objects, as `validate_many()` does, in worker processes
+
+    The objects are sent to the worker processes in chunks, and the results are
+    yielded as they become available, in the order of the objects. At most twice
+    as many chunks as there are workers are in flight at any time, so `objs` can
+    be an arbitrarily long stream.
+
+    Parameters
+    ----------
+    objs: Iterable[dict]
+      The objects to validate
+    schema_version: str, optional
+      Version of schema to validate all objects against.  See `validate()`.
+    schema_key: str, optional
+      Name of the schema key to be used for all objects.  See `validate()`.
+    json_validation: bool, optional
+      If set to True, each object is first validated against the corresponding
+      jsonschema.
+    max_workers: int, optional
+      The number of worker processes. Defaults to the number of CPUs.
+    chunksize: int, optional
+      The number of objects sent to a worker process at a time
+
+    Yields
+    ------
+    Optional[ValueError]
+      For each object, in the order given, `None` if it is valid, or else the
+      exception `validate()` would have raised for it
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # Worker processes are spawned rather than forked, so that they are safe to
+    # start from a multithreaded process and define the models according to the
+    # instance configuration passed to them on every platform
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_validation_worker.init_worker,
+        initargs=(get_instance_config(), json_validation),
+    ) as pool:
+        pending: Deque[Future[List[Optional[ValueError]]]] = deque()
+        it = iter(objs)
+        while chunk := list(islice(it, chunksize)):
+            pending.append(
+                pool.submit(
+                    _validation_worker.validate_chunk,
+                    chunk,
+                    schema_version,
+                    schema_key,
+                    json_validation,
+                )
+            )
+            if len(pending) >= 2 * max_workers:
+                yield from _collect_chunk_results(pending.popleft())
+        while pending:
+            yield from _collect_chunk_results(pending.popleft())
+
+
+def _collect_chunk_results(
+    fut: Future[List[Optional[ValueError]]],
+) -> Iterator[Optional[ValueError]]:
+    for r in fut.result():
+        if isinstance(r, _validation_worker.JsonschemaInvalid):
+            yield r.to_error()
+        else:
+            yield r
+
+
+def _resolve_validation_target(
+    obj: dict, schema_version: Optional[str], schema_key: Optional[str]
+) -> Tuple[str, str]:
+    """
+    Determine the schema version and the schema key to validate an object against,
+    as described in `validate()`
+
+    :raises ValueError: If no schema key is determined, if the schema key or the
+        schema version is not a string, or if the schema version is not an allowed
+        one
+    """
     schema_key = schema_key or obj.get("schemaKey")
     if schema_key is None:
         raise ValueError("Provided object has no known schemaKey")
+    if not isinstance(schema_key, str):
+        raise ValueError(f"schemaKey must be a string, got {schema_key!r}")
     schema_version = schema_version or obj.get("schemaVersion")
+    if schema_version is not None and not isinstance(schema_version, str):
+        raise ValueError(f"schemaVersion must be a string, got {schema_version!r}")
     if schema_version not in ALLOWED_VALIDATION_SCHEMAS and schema_key in SCHEMA_MAP:
         raise ValueError(
             f"Metadata version {schema_version} is not allowed. "
             f"Allowed are: {', '.join(ALLOWED_VALIDATION_SCHEMAS)}."
         )
-    if json_validation:
-        if schema_version == DANDI_SCHEMA_VERSION:
-            jvalidator = _get_jsonschema_validator_local(schema_key)
-        else:
-            if schema_key not in SCHEMA_MAP:
-                raise ValueError(
-                    "Only dandisets and assets can be validated "
-                    "using json schema for older versions"
-                )
-            jvalidator = _get_jsonschema_validator(schema_version, schema_key)
-        validate_json(obj, jvalidator)
-    klass = getattr(models, schema_key)
-    try:
-        klass(**obj)
-    except pydantic.ValidationError as exc:
-        raise PydanticValidationError(exc.errors())  # type: ignore[arg-type]
+    # `schema_version` can only be `None` here for a schema key not in `SCHEMA_MAP`
+    return cast(str, schema_version), schema_key
+
+
+def _get_validation_jsonschema_validator(
+    schema_version: str, schema_key: str
+) -> JsonschemaValidator:
+    """
+    Get the jsonschema validator `validate()` uses for the given schema version and
+    schema key
+    """
+    if schema_version == DANDI_SCHEMA_VERSION:
+        return _get_jsonschema_validator_local(schema_key)
+    if schema_key not in SCHEMA_MAP:
+        raise ValueError(
+            "Only dandisets and assets can be validated "
+            "using json schema for older versions"
+        )
+    return _get_jsonschema_validator(schema_version, schema_key)
+
+
+def _get_model_adapter(schema_key: str) -> pydantic.TypeAdapter:
+    """
+    Get a pydantic type adapter for the DANDI model with the given schema key
+
+    :raises ValueError: If there is no DANDI model with the given schema key
+    """
+    if not isinstance(schema_key, str):
+        raise ValueError(f"Unknown schema key: {schema_key!r}")
+    return _get_model_adapter_cached(schema_key)
+
+
+@cache
+def _get_model_adapter_cached(schema_key: str) -> pydantic.TypeAdapter:
+    klass = getattr(models, schema_key, None)
+    if not isclass(klass) or not issubclass(klass, pydantic.BaseModel):
+        raise ValueError(f"Unknown schema key: {schema_key!r}")
+    return pydantic.TypeAdapter(klass)
 
 
 def migrate(
@@ -427,113 +911,322 @@ def migrate(
     return obj_migrated
 
 
-_stats_var_type = TypeVar("_stats_var_type", int, list)
-_stats_type = Dict[str, _stats_var_type]
+# The sample types counted in an `AssetsSummary`
+_SAMPLE_TYPES = ("cell", "slice", "tissuesample")
 
 
-def _get_samples(value: dict, stats: _stats_type, hierarchy: Any) -> _stats_type:
-    if "sampleType" in value:
-        sampletype = value["sampleType"]["name"]
-        obj = sanitize_value(value["identifier"])
-        if obj not in stats[sampletype]:
-            stats[sampletype].append(obj)
-    if "wasDerivedFrom" in value:
-        for entity in value["wasDerivedFrom"]:
-            if entity.get("schemaKey") == "BioSample":
-                stats = _get_samples(entity, stats, hierarchy)
-                break
-    return stats
+def _canonical_json(value: Any) -> str:
+    # Values that are not JSON-serializable, e.g., URLs in records dumped from
+    # models in Python mode, are keyed by their string representations
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
 
 
-def _add_asset_to_stats(assetmeta: Dict[str, Any], stats: _stats_type) -> None:
-    """Add information about asset to the `stats` dict (to populate AssetsSummary)"""
-    if "schemaVersion" not in assetmeta:
-        raise ValueError("Provided metadata has no schema version")
-    schema_version = cast(str, assetmeta.get("schemaVersion"))
-    if schema_version not in ALLOWED_INPUT_SCHEMAS:
-        raise ValueError(
-            f"Metadata version {schema_version} is not allowed. "
-            f"Allowed are: {', '.join(ALLOWED_INPUT_SCHEMAS)}."
+class AssetsSummaryAggregator:
+    """
+    An aggregate of asset metadata records from which an `AssetsSummary` is produced
+
+    Distinct values of each summarized category (approaches, species, subjects,
+    etc.) are kept in dicts keyed by their canonical JSON serialization, together
+    with the number of added assets each value is contributed by. Adding or
+    removing an asset thus takes time proportional to the size of the asset's
+    metadata, regardless of the number of assets aggregated.
+
+    The values of each category in the summary are listed in the order they were
+    first added to the aggregate. A value stays in its place as long as any asset
+    in the aggregate contributes it, even if the asset that first contributed it is
+    removed. Thus, after removals, the order can differ from that of a summary
+    recomputed from the remaining assets with `aggregate_assets_summary()`. The
+    sets of values are always the same.
+    """
+
+    # The categories of values that are aggregated, in the order values of an asset
+    # are collected
+    _CATEGORIES = (
+        "approach",
+        "measurementTechnique",
+        "variableMeasured",
+        "species",
+        "subjects",
+        *_SAMPLE_TYPES,
+        "dataStandard",
+    )
+
+    def __init__(self) -> None:
+        self.numberOfBytes: int = 0
+        self.numberOfFiles: int = 0
+        # For each category, a mapping of the canonical JSON of each distinct value
+        # to the value and the number of added assets contributing it
+        self._values: Dict[str, Dict[str, Tuple[Any, int]]] = {
+            c: {} for c in self._CATEGORIES
+        }
+
+    def add(self, assetmeta: Dict[str, Any]) -> None:
+        """
+        Add an asset metadata record to the aggregate
+
+        See `apply_delta()` for the exceptions raised.
+        """
+        self.apply_delta(added=[assetmeta])
+
+    def remove(self, assetmeta: Dict[str, Any]) -> None:
+        """
+        Remove an asset metadata record, previously added, from the aggregate
+
+        :raises ValueError: If the record has a missing or disallowed schema version
+            or cannot have been added to the aggregate, in which case the aggregate
+            is left unchanged
+        :raises KeyError: If the record lacks a required field (``contentSize``,
+            ``path``, or ``encodingFormat``) or has a sample of an unknown type, in
+            which case the aggregate is left unchanged
+        """
+        self.apply_delta(removed=[assetmeta])
+
+    def apply_delta(
+        self,
+        added: Iterable[Dict[str, Any]] = (),
+        removed: Iterable[Dict[str, Any]] = (),
+    ) -> None:
+        """
+        Apply a change of the set of aggregated assets
+
+        An asset whose metadata has changed is to be given both in `removed`, with
+        its old metadata, and in `added`, with its new metadata. The records in
+        `removed` are removed before the ones in `added` are added.
+
+        :param added: The metadata records of the assets to add
+        :param removed: The metadata records, previously added, of the assets to
+            remove
+        :raises ValueError: If any record has a missing or disallowed schema version
+            or any record in `removed` cannot have been added to the aggregate, in
+            which case the aggregate is left unchanged
+        :raises KeyError: If any record lacks a required field (``contentSize``,
+            ``path``, or ``encodingFormat``) or has a sample of an unknown type, in
+            which case the aggregate is left unchanged
+        """
+        # Process all records before modifying the aggregate so that it is left
+        # unchanged if any of them is invalid
+        to_remove = [(self._contributions(m), m["contentSize"]) for m in removed]
+        to_add = [(self._contributions(m), m["contentSize"]) for m in added]
+
+        removals: Counter[Tuple[str, str]] = Counter(
+            (category, key)
+            for contributions, _ in to_remove
+            for category, values in contributions.items()
+            for key in values
         )
+        if (
+            len(to_remove) > self.numberOfFiles
+            or sum(size for _, size in to_remove) > self.numberOfBytes
+            or any(
+                self._values[category].get(key, (None, 0))[1] < n
+                for (category, key), n in removals.items()
+            )
+        ):
+            raise ValueError("Asset was not added to the aggregate")
 
-    stats["numberOfBytes"] = stats.get("numberOfBytes", 0)
-    stats["numberOfFiles"] = stats.get("numberOfFiles", 0)
-    stats["numberOfBytes"] += assetmeta["contentSize"]
-    stats["numberOfFiles"] += 1
-
-    for key in ["approach", "measurementTechnique", "variableMeasured"]:
-        stats_values = stats.get(key) or []
-        for val in assetmeta.get(key) or []:
-            if key == "variableMeasured":
-                val = val["value"]
-            if val not in stats_values:
-                stats_values.append(val)
-        stats[key] = stats_values
-
-    stats["subjects"] = stats.get("subjects", [])
-    stats["species"] = stats.get("species", [])
-    for value in assetmeta.get("wasAttributedTo", []):
-        if value.get("schemaKey") == "Participant":
-            if "species" in value:
-                if value["species"] not in stats["species"]:
-                    stats["species"].append(value["species"])
-            if value.get("identifier", None):
-                subject = sanitize_value(value["identifier"])
-                if subject not in stats["subjects"]:
-                    stats["subjects"].append(subject)
-
-    hierarchy = ["cell", "slice", "tissuesample"]
-    for val in hierarchy:
-        stats[val] = stats.get(val, [])
-    for value in assetmeta.get("wasDerivedFrom") or []:
-        if value.get("schemaKey") == "BioSample":
-            stats = _get_samples(value, stats, hierarchy)
-            break
-
-    # which components already found, so we do not count more than
-    # once in some incorrectly named datasets
-    found: Dict[str, str] = {}
-    for part in Path(assetmeta["path"]).name.split(".")[0].split("_"):
-        if not found.get("subject") and part.startswith("sub-"):
-            found["subject"] = subject = part.split("sub-", 1)[1]
-            if subject not in stats["subjects"]:
-                stats["subjects"].append(subject)
-        if not found.get("sample") and part.startswith("sample-"):
-            found["sample"] = sample = part.replace("sample-", "")
-            if sample not in stats["tissuesample"]:
-                stats["tissuesample"].append(sample)
-
-    stats["dataStandard"] = stats.get("dataStandard", [])
-
-    def add_if_missing(standard: dict) -> None:
-        if standard not in stats["dataStandard"]:
-            stats["dataStandard"].append(standard)
-
-    if "nwb" in assetmeta["encodingFormat"]:
-        add_if_missing(models.nwb_standard)
-    # TODO: RF assumption that any .json implies BIDS
-    if Path(assetmeta["path"]).name == "dataset_description.json":
-        add_if_missing(models.bids_standard)
-    if Path(assetmeta["path"]).suffixes == [".ome", ".zarr"]:
-        add_if_missing(models.ome_ngff_standard)
+        for contributions, size in to_remove:
+            for category, values in contributions.items():
+                agg = self._values[category]
+                for key in values:
+                    value, count = agg[key]
+                    if count == 1:
+                        del agg[key]
+                    else:
+                        agg[key] = (value, count - 1)
+            self.numberOfBytes -= size
+            self.numberOfFiles -= 1
+
+        for contributions, size in to_add:
+            for category, values in contributions.items():
+                agg = self._values[category]
+                for key, value in values.items():
+                    if key in agg:
+                        first_value, count = agg[key]
+                        agg[key] = (first_value, count + 1)
+                    else:
+                        agg[key] = (value, 1)
+            self.numberOfBytes += size
+            self.numberOfFiles += 1
+
+    def merge(self, other: "AssetsSummaryAggregator") -> None:
+        """
+        Merge another aggregate into this one, as if the assets added to the other
+        aggregate were added to this one after its own
+
+        Merging is associative, so aggregates of consecutive shards of a sequence
+        of assets, produced independently, e.g., in separate processes, can be
+        merged in order, in any grouping, into an aggregate equivalent to one of
+        the whole sequence.
+        """
+        for category, other_agg in other._values.items():
+            agg = self._values[category]
+            for key, (value, other_count) in other_agg.items():
+                if key in agg:
+                    first_value, count = agg[key]
+                    agg[key] = (first_value, count + other_count)
+                else:
+                    agg[key] = (value, other_count)
+        self.numberOfBytes += other.numberOfBytes
+        self.numberOfFiles += other.numberOfFiles
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Export the aggregate as a JSON-serializable `dict`, from which an equivalent
+        aggregate can be recreated with `from_state()`
+        """
+        return {
+            "numberOfBytes": self.numberOfBytes,
+            "numberOfFiles": self.numberOfFiles,
+            "values": {
+                category: [[value, count] for value, count in agg.values()]
+                for category, agg in self._values.items()
+            },
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "AssetsSummaryAggregator":
+        """
+        Recreate an aggregate from a state exported by `to_state()`
+
+        :raises ValueError: If the state is malformed
+        """
+        aggregator = cls()
+        try:
+            aggregator.numberOfBytes = int(state["numberOfBytes"])
+            aggregator.numberOfFiles = int(state["numberOfFiles"])
+            for category in cls._CATEGORIES:
+                aggregator._values[category] = {
+                    _canonical_json(value): (value, int(count))
+                    for value, count in state["values"][category]
+                }
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed AssetsSummaryAggregator state: {e}") from e
+        return aggregator
+
+    def result(self) -> dict:
+        """Produce the `AssetsSummary`, in JSON-compatible form, of the aggregate"""
+        stats: Dict[str, Any] = {
+            "numberOfBytes": self.numberOfBytes,
+            "numberOfFiles": self.numberOfFiles,
+        }
+        if self.numberOfFiles:
+            for category in [
+                "approach",
+                "measurementTechnique",
+                "variableMeasured",
+                "species",
+                "dataStandard",
+            ]:
+                stats[category] = [v for v, _ in self._values[category].values()]
+        stats["numberOfSubjects"] = len(self._values["subjects"]) or None
+        if stats["numberOfSubjects"]:
+            # Must not happen. If does -- a bug in software
+            assert stats["numberOfFiles"]
+            assert stats["numberOfSubjects"] <= stats["numberOfFiles"]
+        stats["numberOfSamples"] = (
+            len(self._values["tissuesample"]) + len(self._values["slice"])
+        ) or None
+        stats["numberOfCells"] = len(self._values["cell"]) or None
+        return models.AssetsSummary(**stats).model_dump(mode="json", exclude_none=True)
+
+    @classmethod
+    def _contributions(cls, assetmeta: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect the distinct values an asset metadata record contributes to each
+        category, keyed by their canonical JSON, in the order they are encountered
+        """
+        if "schemaVersion" not in assetmeta:
+            raise ValueError("Provided metadata has no schema version")
+        schema_version = cast(str, assetmeta.get("schemaVersion"))
+        if schema_version not in ALLOWED_INPUT_SCHEMAS:
+            raise ValueError(
+                f"Metadata version {schema_version} is not allowed. "
+                f"Allowed are: {', '.join(ALLOWED_INPUT_SCHEMAS)}."
+            )
+
+        contributions: Dict[str, Dict[str, Any]] = {c: {} for c in cls._CATEGORIES}
+
+        def add(category: str, value: Any) -> None:
+            contributions[category].setdefault(_canonical_json(value), value)
+
+        for key in ["approach", "measurementTechnique", "variableMeasured"]:
+            for val in assetmeta.get(key) or []:
+                add(key, val["value"] if key == "variableMeasured" else val)
+
+        for value in assetmeta.get("wasAttributedTo", []):
+            if value.get("schemaKey") == "Participant":
+                if "species" in value:
+                    add("species", value["species"])
+                if value.get("identifier", None):
+                    add("subjects", sanitize_value(value["identifier"]))
+
+        def add_samples(value: dict) -> None:
+            if "sampleType" in value:
+                sampletype = value["sampleType"]["name"]
+                if sampletype not in _SAMPLE_TYPES:
+                    raise KeyError(sampletype)
+                add(sampletype, sanitize_value(value["identifier"]))
+            if "wasDerivedFrom" in value:
+                for entity in value["wasDerivedFrom"]:
+                    if entity.get("schemaKey") == "BioSample":
+                        add_samples(entity)
+                        break
+
+        for value in assetmeta.get("wasDerivedFrom") or []:
+            if value.get("schemaKey") == "BioSample":
+                add_samples(value)
+                break
+
+        # which components already found, so we do not count more than
+        # once in some incorrectly named datasets
+        found: Dict[str, str] = {}
+        for part in Path(assetmeta["path"]).name.split(".")[0].split("_"):
+            if not found.get("subject") and part.startswith("sub-"):
+                found["subject"] = subject = part.split("sub-", 1)[1]
+                add("subjects", subject)
+            if not found.get("sample") and part.startswith("sample-"):
+                found["sample"] = sample = part.replace("sample-", "")
+                add("tissuesample", sample)
+
+        if "nwb" in assetmeta["encodingFormat"]:
+            add("dataStandard", models.nwb_standard)
+        # TODO: RF assumption that any .json implies BIDS
+        if Path(assetmeta["path"]).name == "dataset_description.json":
+            add("dataStandard", models.bids_standard)
+        if Path(assetmeta["path"]).suffixes == [".ome", ".zarr"]:
+            add("dataStandard", models.ome_ngff_standard)
+
+        return contributions
 
 
 # TODO?: move/bind such helpers as .from_metadata or alike within
 #        model classes themselves to centralize access to those constructors.
 def aggregate_assets_summary(metadata: Iterable[Dict[str, Any]]) -> dict:
     """Given an iterable of metadata records produce AssetSummary"""
-    stats: _stats_type = {}
+    aggregator = AssetsSummaryAggregator()
     for meta in metadata:
-        _add_asset_to_stats(meta, stats)
-    stats["numberOfBytes"] = stats.get("numberOfBytes", 0)
-    stats["numberOfFiles"] = stats.get("numberOfFiles", 0)
-    stats["numberOfSubjects"] = len(stats.pop("subjects", [])) or None
-    if stats["numberOfSubjects"]:
-        # Must not happen. If does -- a bug in software
-        assert stats["numberOfFiles"]
-        assert stats["numberOfSubjects"] <= stats["numberOfFiles"]
-    stats["numberOfSamples"] = (
-        len(stats.pop("tissuesample", [])) + len(stats.pop("slice", []))
-    ) or None
-    stats["numberOfCells"] = len(stats.pop("cell", [])) or None
-    return models.AssetsSummary(**stats).model_dump(mode="json", exclude_none=True)
+        aggregator.add(meta)
+    return aggregator.result()
+
+
+def aggregate_assets_summaries(
+    metadata: Iterable[Tuple[str, Dict[str, Any]]],
+) -> Dict[str, dict]:
+    """
+    Given an iterable of pairs of a Dandiset identifier and an asset metadata record
+    produce an AssetSummary for each Dandiset
+
+    The records of the assets of different Dandisets can be interleaved in any way.
+    The result for each Dandiset is the same as that of `aggregate_assets_summary()`
+    over its records, in the order given.
+    """
+    aggregators: Dict[str, AssetsSummaryAggregator] = {}
+    for dandiset_id, meta in metadata:
+        aggregator = aggregators.get(dandiset_id)
+        if aggregator is None:
+            aggregator = aggregators[dandiset_id] = AssetsSummaryAggregator()
+        aggregator.add(meta)
+    return {
+        dandiset_id: aggregator.result()
+        for dandiset_id, aggregator in aggregators.items()
+    }
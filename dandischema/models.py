@@ -81,6 +81,7 @@ DANDI_INSTANCE_URL_PATTERN = (
 )
 
 NAME_PATTERN = r"^([\w\s\-\.']+),\s+([\w\s\-\.']+)$"
+NAME_RE = re.compile(NAME_PATTERN)
 UUID_PATTERN = (
     "[a-f0-9]{8}[-]*[a-f0-9]{4}[-]*" "[a-f0-9]{4}[-]*[a-f0-9]{4}[-]*[a-f0-9]{12}$"
 )
@@ -101,8 +102,14 @@ DANDI_NSKEY = "dandi"  # Namespace for DANDI ontology
 PUBLISHED_VERSION_URL_PATTERN = (
     rf"^{DANDI_INSTANCE_URL_PATTERN}/dandiset/{VERSION_PATTERN}$"
 )
+PUBLISHED_VERSION_URL_RE = re.compile(PUBLISHED_VERSION_URL_PATTERN)
 MD5_PATTERN = r"[0-9a-f]{32}"
 SHA256_PATTERN = r"[0-9a-f]{64}"
+SHA256_RE = re.compile(SHA256_PATTERN)
+DANDI_ETAG_RE = re.compile(DandiETag.REGEX)
+# The pattern of a license in the form of "scheme:identifier"
+LICENSE_PATTERN = r"^([^:\s]+):(\S+)$"
+LICENSE_RE = re.compile(LICENSE_PATTERN)
 
 M = TypeVar("M", bound=BaseModel)
 
@@ -1883,7 +1890,7 @@ class BareAsset(CommonModel):
             if v.get(DigestType.dandi_zarr_checksum):
                 raise ValueError("Digest cannot have both etag and zarr checksums.")
             digest = v[DigestType.dandi_etag]
-            if not re.fullmatch(DandiETag.REGEX, digest):
+            if not DANDI_ETAG_RE.fullmatch(digest):
                 raise ValueError(
                     f"Digest must have an appropriate dandi-etag value. "
                     f"Got {digest}"
@@ -1966,7 +1973,7 @@ class PublishedDandiset(Dandiset, Publishable):
     @field_validator("url")
     @classmethod
     def check_url(cls, url: AnyHttpUrl) -> AnyHttpUrl:
-        if not re.match(PUBLISHED_VERSION_URL_PATTERN, str(url)):
+        if not PUBLISHED_VERSION_URL_RE.match(str(url)):
             raise ValueError(
                 f'string does not match regex "{PUBLISHED_VERSION_URL_PATTERN}"'
             )
@@ -1994,7 +2001,7 @@ class PublishedAsset(Asset, Publishable):
             if DigestType.sha2_256 not in v:
                 raise ValueError("A non-zarr asset must have a sha2_256.")
             digest = v[DigestType.sha2_256]
-            if not re.fullmatch(SHA256_PATTERN, digest):
+            if not SHA256_RE.fullmatch(digest):
                 raise ValueError(
                     f"Digest must have an appropriate sha2_256 value. Got {digest}"
                 )
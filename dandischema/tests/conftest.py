@@ -1,12 +1,15 @@
+import json
 import os
 import sys
-from typing import Generator, Iterator
+from typing import Any, Dict, Generator, Iterator
 
 from pydantic import ConfigDict, TypeAdapter, ValidationError
 import pytest
 from typing_extensions import TypedDict
 
 from dandischema.conf import Config
+from dandischema.consts import DANDI_SCHEMA_VERSION
+from dandischema.tests.utils import METADATA_DIR
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -20,6 +23,42 @@ def disable_http() -> Iterator[None]:
         yield
 
 
+def _load_metadata(filename: str) -> Dict[str, Any]:
+    meta: Dict[str, Any] = json.loads((METADATA_DIR / filename).read_text())
+    return meta
+
+
+@pytest.fixture
+def valid_asset() -> Dict[str, Any]:
+    """
+    The metadata of a valid asset, `asset_001.json`, set to the current DANDI schema
+    version
+    """
+    meta = _load_metadata("asset_001.json")
+    # Overload schemaVersion until we support automagic schema migrations, under the
+    # assumption that the schema of the record is forward compatible
+    meta["schemaVersion"] = DANDI_SCHEMA_VERSION
+    return meta
+
+
+@pytest.fixture
+def asset3_01() -> Dict[str, Any]:
+    """The metadata in `asset3_01.json`"""
+    return _load_metadata("asset3_01.json")
+
+
+@pytest.fixture
+def asset4_01() -> Dict[str, Any]:
+    """The metadata in `asset4_01.json`"""
+    return _load_metadata("asset4_01.json")
+
+
+@pytest.fixture
+def asset4_02() -> Dict[str, Any]:
+    """The metadata in `asset4_02.json`"""
+    return _load_metadata("asset4_02.json")
+
+
 _CONFIG_PARAMS = list(Config.model_fields)
 """Configuration parameters of the `dandischema` package"""
 # noinspection PyTypedDict
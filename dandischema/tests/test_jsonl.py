@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ..consts import DANDI_SCHEMA_VERSION
+from ..jsonl import iter_validate_jsonl, main
+
+
+@pytest.fixture
+def jsonl_lines(valid_asset: dict) -> list[str]:
+    return [
+        json.dumps(valid_asset),
+        "",
+        json.dumps({"schemaKey": "Asset", "schemaVersion": DANDI_SCHEMA_VERSION}),
+        "{not json",
+        "[]",
+        json.dumps({}),
+        json.dumps(valid_asset),
+    ]
+
+
+@pytest.mark.parametrize("json_validation", [False, True])
+def test_iter_validate_jsonl(jsonl_lines: list[str], json_validation: bool) -> None:
+    results = list(
+        iter_validate_jsonl(jsonl_lines, json_validation=json_validation, chunksize=2)
+    )
+    assert [(r["line"], r["valid"]) for r in results] == [
+        (1, True),
+        (3, False),
+        (4, False),
+        (5, False),
+        (6, False),
+        (7, True),
+    ]
+    assert any(e.startswith("id") for e in results[1]["errors"]) or json_validation
+    assert results[2]["errors"][0].startswith("Invalid JSON: ")
+    assert results[3]["errors"] == ["Record is not a JSON object"]
+    assert results[4]["errors"] == ["Provided object has no known schemaKey"]
+
+
+def test_main(jsonl_lines: list[str], tmp_path: Path) -> None:
+    infile = tmp_path / "records.jsonl"
+    infile.write_text("\n".join(jsonl_lines) + "\n")
+    outfile = tmp_path / "results.jsonl"
+    assert main([str(infile), "-o", str(outfile)]) == 1
+    results = [json.loads(line) for line in outfile.read_text().splitlines()]
+    assert [r["valid"] for r in results] == [True, False, False, False, False, True]
+
+    infile.write_text(jsonl_lines[0] + "\n")
+    assert main([str(infile), "-o", str(outfile)]) == 0
+    assert outfile.read_text() == '{"line":1,"valid":true}\n'
+
+
+def test_iter_validate_jsonl_non_string_schema_key(jsonl_lines: list[str]) -> None:
+    lines = [json.dumps({"schemaKey": 5}), json.dumps({}), jsonl_lines[0]]
+    results = list(iter_validate_jsonl(lines))
+    assert [(r["line"], r["valid"]) for r in results] == [
+        (1, False),
+        (2, False),
+        (3, True),
+    ]
+    assert results[0]["errors"] == ["schemaKey must be a string, got 5"]
@@ -1,14 +1,22 @@
 from hashlib import md5, sha256
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional, Sequence, Set
+import pickle
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
 from unittest.mock import MagicMock, patch
 
 from jsonschema.protocols import Validator as JsonschemaValidator
 from pydantic import BaseModel
 import pytest
 
-from dandischema.models import Asset, Dandiset, PublishedAsset, PublishedDandiset
+from dandischema.models import (
+    ApproachType,
+    Asset,
+    Dandiset,
+    PublishedAsset,
+    PublishedDandiset,
+)
 from dandischema.utils import TransitionalGenerateJsonSchema
 
 from .utils import (
@@ -20,17 +28,34 @@ from .utils import (
     skipif_no_network,
     skipif_no_test_dandiset_metadata_dir,
 )
+from .._validation_worker import JsonschemaInvalid
 from ..consts import DANDI_SCHEMA_VERSION
-from ..exceptions import JsonschemaValidationError, PydanticValidationError
+from ..exceptions import (
+    JsonschemaValidationError,
+    PydanticValidationError,
+    ValidationError,
+)
 from ..metadata import (
+    AssetsSummaryAggregator,
     _get_jsonschema_validator,
     _get_jsonschema_validator_local,
+    _get_model_adapter,
+    _get_model_json_schema,
+    _get_schema_file_validator,
     _validate_asset_json,
+    _validate_assets_json,
     _validate_dandiset_json,
+    _validate_dandisets_json,
+    aggregate_assets_summaries,
     aggregate_assets_summary,
+    generate_context,
+    get_context_artifact,
     migrate,
+    populate_schema_store,
     publish_model_schemata,
     validate,
+    validate_many,
+    validate_parallel,
 )
 
 
@@ -57,6 +82,50 @@ def test_dandiset(schema_dir: Path) -> None:
     _validate_dandiset_json(data_as_dict, schema_dir)
 
 
+def test_schema_file_validator_cache(
+    tmp_path: Path, valid_asset: Dict[str, Any]
+) -> None:
+    schema_dir = publish_model_schemata(tmp_path)
+    validator = _get_schema_file_validator(schema_dir, "asset.json")
+    assert _get_schema_file_validator(str(schema_dir), "asset.json") is validator
+
+    # A modified schema file is read again
+    schema_file = schema_dir / "asset.json"
+    schema = json.loads(schema_file.read_text())
+    schema["required"].append("extraField")
+    schema_file.write_text(json.dumps(schema))
+    st = schema_file.stat()
+    os.utime(schema_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    new_validator = _get_schema_file_validator(schema_dir, "asset.json")
+    assert new_validator is not validator
+    assert validator.is_valid(valid_asset)
+    assert not new_validator.is_valid(valid_asset)
+    assert _get_schema_file_validator(schema_dir, "asset.json") is new_validator
+
+
+def test_validate_assets_json(schema_dir: Path, valid_asset: Dict[str, Any]) -> None:
+    results = _validate_assets_json([valid_asset, {}, valid_asset], schema_dir)
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], JsonschemaValidationError)
+    assert results[1].errors
+
+    assert _validate_dandisets_json([], schema_dir) == []
+    (dandiset_result,) = _validate_dandisets_json([{}], schema_dir)
+    assert isinstance(dandiset_result, JsonschemaValidationError)
+
+
+def test_generate_context_cached(schema_dir: Path) -> None:
+    context = generate_context()
+    assert context == json.loads((schema_dir / "context.json").read_text())
+    context["@context"]["extra"] = "value"
+    assert "extra" not in generate_context()["@context"]
+
+    artifact = get_context_artifact()
+    assert get_context_artifact() is artifact
+    assert json.loads(artifact.content) == generate_context()
+    assert artifact.etag == sha256(artifact.content).hexdigest()
+
+
 def test_id(schema_dir: Path) -> None:
     with open(schema_dir / "context.json") as fp:
         context = json.load(fp)
@@ -110,6 +179,11 @@ def test_mismatch_key(schema_version: str, schema_key: str) -> None:
         validate({}, schema_version=schema_version, schema_key=schema_key)
 
 
+def test_validate_unknown_schema_key() -> None:
+    with pytest.raises(ValueError, match="Unknown schema key: 'DigestType'"):
+        validate({"schemaKey": "DigestType", "schemaVersion": DANDI_SCHEMA_VERSION})
+
+
 @pytest.mark.parametrize(
     "obj, schema_key, missingfields",
     [
@@ -574,6 +648,23 @@ def test_aggregate(files: Sequence[str], summary: Dict[str, Any]) -> None:
     assert aggregate_assets_summary(metadata) == summary
 
 
+def test_aggregate_assets_summaries(
+    asset3_01: Dict[str, Any], asset4_01: Dict[str, Any], asset4_02: Dict[str, Any]
+) -> None:
+    summaries = aggregate_assets_summaries(
+        [
+            ("000004", asset4_01),
+            ("000003", asset3_01),
+            ("000004", asset4_02),
+            ("000003", asset3_01),
+        ]
+    )
+    assert summaries == {
+        "000004": aggregate_assets_summary([asset4_01, asset4_02]),
+        "000003": aggregate_assets_summary([asset3_01, asset3_01]),
+    }
+
+
 def test_aggregate_norecord() -> None:
     assert aggregate_assets_summary([]) == {
         "numberOfBytes": 0,
@@ -582,6 +673,172 @@ def test_aggregate_norecord() -> None:
     }
 
 
+def test_assets_summary_aggregator_add_remove(
+    asset3_01: Dict[str, Any], asset4_01: Dict[str, Any], asset4_02: Dict[str, Any]
+) -> None:
+    aggregator = AssetsSummaryAggregator()
+    for meta in [asset4_01, asset3_01, asset4_02, asset3_01]:
+        aggregator.add(meta)
+    aggregator.remove(asset3_01)
+    aggregator.remove(asset3_01)
+    assert aggregator.result() == aggregate_assets_summary([asset4_01, asset4_02])
+    aggregator.remove(asset4_01)
+    aggregator.remove(asset4_02)
+    assert aggregator.result() == aggregate_assets_summary([])
+    with pytest.raises(ValueError, match="Asset was not added"):
+        aggregator.remove(asset4_01)
+
+
+def test_assets_summary_aggregator_order_after_remove() -> None:
+    def asset(path: str, approach: str) -> Dict[str, Any]:
+        return {
+            "schemaVersion": DANDI_SCHEMA_VERSION,
+            "contentSize": 1,
+            "path": path,
+            "encodingFormat": "application/octet-stream",
+            "approach": [{"schemaKey": "ApproachType", "name": approach}],
+        }
+
+    a, b, c = asset("a", "X"), asset("b", "Y"), asset("c", "X")
+    aggregator = AssetsSummaryAggregator()
+    for meta in [a, b, c]:
+        aggregator.add(meta)
+    aggregator.remove(a)
+    # X keeps its place since C still contributes it, whereas a recomputation
+    # lists Y, contributed by B, first
+    assert [v["name"] for v in aggregator.result()["approach"]] == ["X", "Y"]
+    recomputed = aggregate_assets_summary([b, c])
+    assert [v["name"] for v in recomputed["approach"]] == ["Y", "X"]
+    assert {**aggregator.result(), "approach": None} == {
+        **recomputed,
+        "approach": None,
+    }
+
+
+def test_aggregate_non_json_values() -> None:
+    approach = ApproachType(
+        identifier="http://uri.interlex.org/base/ilx_0739363",
+        name="behavioral approach",
+    )
+    meta = {
+        "schemaVersion": DANDI_SCHEMA_VERSION,
+        "contentSize": 1,
+        "path": "sub-1/sub-1_behavior.nwb",
+        "encodingFormat": "application/x-nwb",
+        "approach": [approach.model_dump()],
+    }
+    summary = aggregate_assets_summary([meta, meta])
+    assert summary == aggregate_assets_summary(
+        [{**meta, "approach": [approach.model_dump(mode="json")]}] * 2
+    )
+    assert len(summary["approach"]) == 1
+
+
+def test_assets_summary_aggregator_remove_not_added(
+    asset3_01: Dict[str, Any], asset4_01: Dict[str, Any]
+) -> None:
+    aggregator = AssetsSummaryAggregator()
+    aggregator.add(asset3_01)
+    summary = aggregator.result()
+    with pytest.raises(ValueError, match="Asset was not added"):
+        aggregator.remove(asset4_01)
+    assert aggregator.result() == summary
+    larger = {**asset3_01, "contentSize": asset3_01["contentSize"] + 10**12}
+    with pytest.raises(ValueError, match="Asset was not added"):
+        aggregator.remove(larger)
+    assert aggregator.result() == summary
+
+
+@pytest.mark.parametrize("field", ["contentSize", "path", "encodingFormat"])
+def test_assets_summary_aggregator_missing_field(
+    field: str, asset3_01: Dict[str, Any], asset4_01: Dict[str, Any]
+) -> None:
+    aggregator = AssetsSummaryAggregator()
+    aggregator.add(asset3_01)
+    state = aggregator.to_state()
+    incomplete = {k: v for k, v in asset4_01.items() if k != field}
+    with pytest.raises(KeyError):
+        aggregator.apply_delta(added=[asset4_01, incomplete])
+    with pytest.raises(KeyError):
+        aggregator.remove({k: v for k, v in asset3_01.items() if k != field})
+    assert aggregator.to_state() == state
+
+
+def test_assets_summary_aggregator_unknown_sample_type(
+    asset4_01: Dict[str, Any],
+) -> None:
+    meta = {
+        **asset4_01,
+        "wasDerivedFrom": [
+            {
+                "schemaKey": "BioSample",
+                "identifier": "s1",
+                "sampleType": {"schemaKey": "SampleType", "name": "organoid"},
+            }
+        ],
+    }
+    aggregator = AssetsSummaryAggregator()
+    with pytest.raises(KeyError, match="organoid"):
+        aggregator.add(meta)
+    assert aggregator.result() == aggregate_assets_summary([])
+
+
+def test_assets_summary_aggregator_apply_delta_and_state(
+    asset3_01: Dict[str, Any], asset4_01: Dict[str, Any], asset4_02: Dict[str, Any]
+) -> None:
+    aggregator = AssetsSummaryAggregator()
+    aggregator.apply_delta(added=[asset3_01, asset4_01])
+    state = json.loads(json.dumps(aggregator.to_state()))
+    restored = AssetsSummaryAggregator.from_state(state)
+    assert restored.result() == aggregator.result()
+
+    # A delta that cannot be applied leaves the aggregate unchanged
+    with pytest.raises(ValueError, match="Asset was not added"):
+        restored.apply_delta(added=[asset4_02], removed=[asset4_01, asset4_01])
+    assert restored.to_state() == state
+
+    changed = {**asset4_01, "contentSize": asset4_01["contentSize"] + 1}
+    restored.apply_delta(added=[changed, asset4_02], removed=[asset4_01])
+    assert restored.result() == aggregate_assets_summary(
+        [asset3_01, changed, asset4_02]
+    )
+
+
+def test_assets_summary_aggregator_merge(
+    asset3_01: Dict[str, Any], asset4_01: Dict[str, Any], asset4_02: Dict[str, Any]
+) -> None:
+    metadata = [asset4_01, asset3_01, asset4_02, asset3_01, asset4_01]
+
+    def aggregate(metas: List[Dict[str, Any]]) -> AssetsSummaryAggregator:
+        aggregator = AssetsSummaryAggregator()
+        for meta in metas:
+            aggregator.add(meta)
+        return aggregator
+
+    a, b, c = aggregate(metadata[:2]), aggregate(metadata[2:3]), aggregate(metadata[3:])
+    a.merge(b)
+    a.merge(c)
+    assert a.result() == aggregate_assets_summary(metadata)
+
+    a, b, c = aggregate(metadata[:2]), aggregate(metadata[2:3]), aggregate(metadata[3:])
+    b.merge(c)
+    a.merge(b)
+    assert a.to_state() == aggregate(metadata).to_state()
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {},
+        {"numberOfBytes": 0, "numberOfFiles": 0},
+        {"numberOfBytes": 0, "numberOfFiles": 0, "values": {"approach": [[{}]]}},
+    ],
+)
+def test_assets_summary_aggregator_from_state_malformed(state: dict) -> None:
+    with pytest.raises(ValueError, match="Malformed AssetsSummaryAggregator state"):
+        AssetsSummaryAggregator.from_state(state)
+
+
 @pytest.mark.parametrize(
     "version", ["0.1.0", DANDI_SCHEMA_VERSION.rsplit(".", 1)[0], "10000.0.0"]
 )
@@ -613,6 +870,91 @@ def test_validate_older() -> None:
         )
 
 
+@pytest.mark.parametrize("json_validation", [False, True])
+def test_validate_many(json_validation: bool, valid_asset: Dict[str, Any]) -> None:
+    invalid_asset = {"schemaKey": "Asset", "schemaVersion": DANDI_SCHEMA_VERSION}
+    objs = [
+        valid_asset,
+        {},
+        invalid_asset,
+        {"schemaKey": "Asset", "schemaVersion": "0.4.2"},
+        valid_asset,
+        {"schemaKey": 5},
+        {"schemaKey": ["Asset"]},
+        {"schemaKey": "Participant", "schemaVersion": [1]},
+    ]
+    results = validate_many(objs, json_validation=json_validation)
+    assert len(results) == len(objs)
+    assert results[0] is None
+    assert results[4] is None
+    for i in (1, 3, 5, 6, 7):
+        assert type(results[i]) is ValueError
+    assert isinstance(
+        results[2],
+        JsonschemaValidationError if json_validation else PydanticValidationError,
+    )
+    assert isinstance(results[2], (JsonschemaValidationError, PydanticValidationError))
+    with pytest.raises(ValidationError) as exc:
+        validate(invalid_asset, json_validation=json_validation)
+    assert type(exc.value) is type(results[2])
+    assert isinstance(exc.value, (JsonschemaValidationError, PydanticValidationError))
+    assert str(exc.value.errors) == str(results[2].errors)
+
+
+@pytest.mark.parametrize("schema_key", [5, ["Asset"]])
+def test_get_model_adapter_non_string_key(schema_key: Any) -> None:
+    with pytest.raises(ValueError, match="Unknown schema key"):
+        _get_model_adapter(schema_key)
+
+
+def test_validate_parallel(valid_asset: Dict[str, Any]) -> None:
+    invalid_asset = {"schemaKey": "Asset", "schemaVersion": DANDI_SCHEMA_VERSION}
+    objs = [valid_asset, {}, invalid_asset] * 5
+    # The JSON schema errors are sent back from the workers rather than recreated
+    # by validating again in this process
+    with (
+        patch("dandischema.metadata.validate_many", side_effect=AssertionError),
+        patch("dandischema.metadata.validate", side_effect=AssertionError),
+    ):
+        results = list(
+            validate_parallel(objs, json_validation=True, max_workers=2, chunksize=2)
+        )
+    expected = validate_many(objs, json_validation=True)
+    assert [type(r) for r in results] == [type(r) for r in expected]
+    assert isinstance(results[2], JsonschemaValidationError)
+    assert isinstance(expected[2], JsonschemaValidationError)
+    assert str(results[2].errors) == str(expected[2].errors)
+
+
+def test_jsonschema_invalid_round_trip() -> None:
+    obj = {
+        "schemaKey": "Asset",
+        "schemaVersion": DANDI_SCHEMA_VERSION,
+        "contributor": [{"schemaKey": "Person", "name": 3}],
+    }
+    (err,) = validate_many([obj], json_validation=True)
+    assert isinstance(err, JsonschemaValidationError)
+
+    def walk(errors: Sequence[Any]) -> Iterator[Any]:
+        for e in errors:
+            yield e
+            yield from walk(e.context)
+
+    # The errors include ones with sub-errors, e.g., of an `anyOf`
+    assert any(e.context for e in err.errors)
+    marker = pickle.loads(pickle.dumps(JsonschemaInvalid.from_error(err)))
+    recreated = marker.to_error()
+    assert [str(e) for e in walk(recreated.errors)] == [
+        str(e) for e in walk(err.errors)
+    ]
+    assert [e.json_path for e in walk(recreated.errors)] == [
+        e.json_path for e in walk(err.errors)
+    ]
+    assert [list(e.absolute_schema_path) for e in walk(recreated.errors)] == [
+        list(e.absolute_schema_path) for e in walk(err.errors)
+    ]
+
+
 def test_aggregation_bids() -> None:
     data = [
         {
@@ -795,6 +1137,90 @@ class TestGetJsonschemaValidator:
             mock_response.raise_for_status.assert_called_once()
             mock_response.json.assert_called_once()
 
+    def test_schema_store(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Test that a schema fetched from the `dandi/schema` repository is saved in the
+        local schema store and that a schema in the store is used without any
+        network access
+        """
+        valid_version = "0.6.0"
+        valid_key = "Dandiset"
+        valid_schema = {"type": "object"}
+        monkeypatch.setenv("DANDI_SCHEMA_STORE", str(tmp_path))
+
+        with (
+            patch("requests.get") as mock_get,
+            patch("dandischema.metadata.dandi_jsonschema_validator") as mock_validator,
+        ):
+            mock_get.return_value.json.return_value = valid_schema
+
+            _get_jsonschema_validator.cache_clear()
+            _get_jsonschema_validator(valid_version, valid_key)
+            mock_get.assert_called_once()
+            stored = tmp_path / valid_version / "dandiset.json"
+            assert json.loads(stored.read_text()) == valid_schema
+
+            mock_get.reset_mock()
+            _get_jsonschema_validator.cache_clear()
+            _get_jsonschema_validator(valid_version, valid_key)
+            mock_get.assert_not_called()
+            assert mock_validator.call_args_list == [((valid_schema,),)] * 2
+
+        _get_jsonschema_validator.cache_clear()
+
+    def test_schema_store_not_writable(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """
+        Test that a fetched schema is used even if it cannot be saved in the local
+        schema store
+        """
+        valid_schema = {"type": "object"}
+        monkeypatch.setenv("DANDI_SCHEMA_STORE", str(tmp_path))
+
+        with (
+            patch("requests.get") as mock_get,
+            patch(
+                "dandischema.metadata._write_schema_file",
+                side_effect=PermissionError("Read-only file system"),
+            ),
+            patch("dandischema.metadata.dandi_jsonschema_validator") as mock_validator,
+        ):
+            mock_get.return_value.json.return_value = valid_schema
+
+            _get_jsonschema_validator.cache_clear()
+            result = _get_jsonschema_validator("0.6.0", "Dandiset")
+            assert result is mock_validator.return_value
+            mock_validator.assert_called_once_with(valid_schema)
+        assert "Read-only file system" in caplog.text
+
+        _get_jsonschema_validator.cache_clear()
+
+    def test_populate_schema_store(self, tmp_path: Path) -> None:
+        with patch("requests.get") as mock_get:
+            mock_get.return_value.json.return_value = {"type": "object"}
+            populate_schema_store(tmp_path, ["0.6.0", "0.6.1"])
+        assert mock_get.call_count == 8
+        assert sorted(
+            p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.json")
+        ) == [
+            f"{v}/{f}"
+            for v in ["0.6.0", "0.6.1"]
+            for f in sorted(
+                [
+                    "asset.json",
+                    "dandiset.json",
+                    "published-asset.json",
+                    "published-dandiset.json",
+                ]
+            )
+        ]
+
 
 class TestGetJsonschemaValidatorLocal:
     @pytest.mark.parametrize(
@@ -829,6 +1255,53 @@ class TestGetJsonschemaValidatorLocal:
             f"but got:\n{validator.schema}"
         )
 
+    def test_schema_cache(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Test that a generated schema is saved in the schema cache directory and
+        that a later lookup loads it from there instead of generating it
+        """
+        expected_schema = Asset.model_json_schema(
+            schema_generator=TransitionalGenerateJsonSchema
+        )
+        monkeypatch.setenv("DANDI_SCHEMA_CACHE", str(tmp_path))
+        _get_model_json_schema.cache_clear()
+        try:
+            assert _get_model_json_schema("Asset") == expected_schema
+            (cached,) = tmp_path.rglob("asset.json")
+            assert cached.relative_to(tmp_path).parts[0] == DANDI_SCHEMA_VERSION
+
+            _get_model_json_schema.cache_clear()
+            with patch.object(
+                Asset, "model_json_schema", side_effect=AssertionError
+            ) as mock_gen:
+                assert _get_model_json_schema("Asset") == expected_schema
+            mock_gen.assert_not_called()
+        finally:
+            _get_model_json_schema.cache_clear()
+
+    def test_schema_cache_not_writable(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        expected_schema = Asset.model_json_schema(
+            schema_generator=TransitionalGenerateJsonSchema
+        )
+        monkeypatch.setenv("DANDI_SCHEMA_CACHE", str(tmp_path))
+        _get_model_json_schema.cache_clear()
+        try:
+            with patch(
+                "dandischema.metadata._write_schema_file",
+                side_effect=PermissionError("Read-only file system"),
+            ):
+                assert _get_model_json_schema("Asset") == expected_schema
+            assert "Read-only file system" in caplog.text
+        finally:
+            _get_model_json_schema.cache_clear()
+
     @pytest.mark.parametrize(
         "invalid_schema_key",
         [
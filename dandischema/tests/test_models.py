@@ -1,4 +1,5 @@
 from collections import namedtuple
+from contextlib import nullcontext
 from enum import Enum
 from inspect import isclass
 from typing import Any, Dict, List, Literal, Optional, Tuple, Type, Union, cast
@@ -1060,3 +1061,88 @@ class TestDandisetSameAs:
         base_dandiset_metadata["sameAs"] = dandi_urls
         with pytest.raises(ValidationError):
             Dandiset.model_validate(base_dandiset_metadata)
+
+
+@pytest.mark.parametrize(
+    "etag, valid",
+    [
+        (32 * "a" + "-1", True),
+        (32 * "0" + "-12345", True),
+        (32 * "a", False),
+        (32 * "A" + "-1", False),
+        (31 * "a" + "-1", False),
+        (32 * "a" + "-123456", False),
+        (32 * "a" + "-1\n", False),
+        ("x" + 32 * "a" + "-1", False),
+    ],
+)
+def test_bare_asset_dandi_etag(etag: str, valid: bool) -> None:
+    with pytest.raises(pydantic.ValidationError) if not valid else nullcontext():
+        models.BareAsset(
+            contentSize=100,
+            encodingFormat="nwb",
+            digest={models.DigestType.dandi_etag: etag},
+            path="/",
+        )
+
+
+@pytest.mark.parametrize(
+    "sha256, valid",
+    [
+        (64 * "a", True),
+        (64 * "0", True),
+        (63 * "a", False),
+        (65 * "a", False),
+        (64 * "A", False),
+        (64 * "g", False),
+        (64 * "a" + "\n", False),
+    ],
+)
+def test_published_asset_sha256(sha256: str, valid: bool) -> None:
+    with pytest.raises(pydantic.ValidationError) as exc:
+        models.PublishedAsset(  # type: ignore[call-arg]
+            contentSize=100,
+            encodingFormat="nwb",
+            digest={
+                models.DigestType.dandi_etag: 32 * "a" + "-1",
+                models.DigestType.sha2_256: sha256,
+            },
+            path="/",
+        )
+    sha256_errors = [
+        el
+        for el in exc.value.errors()
+        if "Digest must have an appropriate sha2_256 value." in el["msg"]
+    ]
+    assert bool(sha256_errors) != valid
+
+
+@pytest.mark.parametrize(
+    "path, valid",
+    [
+        ("/dandiset/000004/0.230101.0101", True),
+        ("/dandiset/999999/1.2.3", True),
+        ("/dandiset/000004/draft", False),
+        ("/dandiset/4/0.230101.0101", False),
+        ("/dandiset/000004/0.230101.0101/files", False),
+        ("/dandisets/000004/0.230101.0101", False),
+    ],
+)
+def test_published_dandiset_check_url(
+    base_dandiset_metadata: dict[str, Any], path: str, valid: bool
+) -> None:
+    instance_url = _INSTANCE_CONFIG.instance_url
+    base_url = (
+        str(instance_url).rstrip("/")
+        if instance_url is not None
+        else "https://dandiarchive.org"
+    )
+    base_dandiset_metadata["url"] = base_url + path
+    with pytest.raises(ValidationError) as exc:
+        PublishedDandiset(**base_dandiset_metadata)
+    url_errors = [el for el in exc.value.errors() if el["loc"] == ("url",)]
+    assert bool(url_errors) != valid
+    if not valid:
+        assert url_errors[0]["msg"].startswith(
+            "Value error, string does not match regex"
+        )
@@ -1,5 +1,6 @@
 from contextlib import nullcontext
-from typing import Any, Dict, List, Optional, Union, cast
+from copy import copy, deepcopy
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, cast
 from unittest.mock import patch
 
 from jsonschema.exceptions import SchemaError, ValidationError
@@ -10,10 +11,13 @@ import pytest
 from dandischema.exceptions import JsonschemaValidationError
 from dandischema.utils import (
     _ensure_newline,
+    clear_jsonschema_validator_cache,
     dandi_jsonschema_validator,
+    iter_json_errors,
     jsonschema_validator,
     name2title,
     sanitize_value,
+    set_jsonschema_compiler,
     strip_top_level_optional,
     validate_json,
     version2tuple,
@@ -418,8 +422,61 @@ class TestValidateJson:
             isinstance(err, ValidationError) for err in errs
         ), "All errors must be `jsonschema.exceptions.ValidationError`"
 
+    @pytest.mark.parametrize(
+        "instance, max_errors, expected_error_count",
+        [
+            pytest.param({}, 1, 1, id="first_error_only"),
+            pytest.param({}, 2, 2, id="bound_reached"),
+            pytest.param({}, 5, 2, id="bound_not_reached"),
+            pytest.param({"name": 123}, 1, 1, id="first_of_mixed_errors"),
+        ],
+    )
+    def test_max_errors(
+        self,
+        multiple_required_validator: JsonschemaValidator,
+        instance: Dict[str, Any],
+        max_errors: int,
+        expected_error_count: int,
+    ) -> None:
+        with pytest.raises(JsonschemaValidationError) as exc_info:
+            validate_json(instance, multiple_required_validator, max_errors=max_errors)
+        assert len(exc_info.value.errors) == expected_error_count
+
+    def test_max_errors_valid_instance(
+        self, multiple_required_validator: JsonschemaValidator
+    ) -> None:
+        validate_json(
+            {"name": "Bob", "title": "Something"},
+            multiple_required_validator,
+            max_errors=1,
+        )
+
+    @pytest.mark.parametrize("max_errors", [0, -1])
+    def test_max_errors_invalid(
+        self, draft7_validator: JsonschemaValidator, max_errors: int
+    ) -> None:
+        with pytest.raises(ValueError, match="max_errors"):
+            validate_json({}, draft7_validator, max_errors=max_errors)
+
+    def test_iter_json_errors_is_lazy(
+        self, multiple_required_validator: JsonschemaValidator
+    ) -> None:
+        errors = iter_json_errors({}, multiple_required_validator)
+        first = next(errors)
+        assert isinstance(first, ValidationError)
+        assert first.validator == "required"
+        assert len(list(errors)) == 1
+        valid = {"name": "Bob", "title": "Something"}
+        assert list(iter_json_errors(valid, multiple_required_validator)) == []
+
 
 class TestDandiJsonschemaValidator:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> Iterator[None]:
+        clear_jsonschema_validator_cache()
+        yield
+        clear_jsonschema_validator_cache()
+
     @pytest.mark.parametrize(
         "version, expected_validator_cls",
         [
@@ -452,6 +509,40 @@ class TestDandiJsonschemaValidator:
                 default_cls=expected_validator_cls,
             )
 
+    def test_cache(self) -> None:
+        schema = {
+            "properties": {
+                "schemaVersion": {"type": "string", "default": "0.7.0"},
+                "name": {"type": "string"},
+            }
+        }
+        validator = dandi_jsonschema_validator(schema)
+        with patch.object(
+            Draft202012Validator, "check_schema", autospec=True
+        ) as mock_check_schema:
+            assert dandi_jsonschema_validator(deepcopy(schema)) is validator
+        mock_check_schema.assert_not_called()
+
+        # The cached validator is not affected by modifications of the schema
+        schema["properties"]["name"]["type"] = "integer"
+        assert validator.is_valid({"name": "Alice"})
+        other = dandi_jsonschema_validator(schema)
+        assert other is not validator
+        assert not other.is_valid({"name": "Alice"})
+
+    def test_cache_eviction(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("dandischema.utils.JSONSCHEMA_VALIDATOR_CACHE_SIZE", 2)
+        schemas = [
+            {"properties": {"schemaVersion": {"default": "0.7.0"}}, "title": str(i)}
+            for i in range(3)
+        ]
+        validators = [dandi_jsonschema_validator(s) for s in schemas[:2]]
+        # Make the first validator the most recently used one
+        assert dandi_jsonschema_validator(schemas[0]) is validators[0]
+        dandi_jsonschema_validator(schemas[2])
+        assert dandi_jsonschema_validator(schemas[0]) is validators[0]
+        assert dandi_jsonschema_validator(schemas[1]) is not validators[1]
+
     @pytest.mark.parametrize(
         "schema",
         [
@@ -476,3 +567,73 @@ class TestDandiJsonschemaValidator:
             ValueError, match="schema must has a 'schemaVersion' property"
         ):
             dandi_jsonschema_validator(schema)
+
+
+class TestJsonschemaCompiler:
+    SCHEMA = {
+        "type": "object",
+        "properties": {
+            "schemaVersion": {"type": "string", "default": "0.7.0"},
+            "name": {"type": "string"},
+        },
+        "required": ["name"],
+    }
+
+    @pytest.fixture(autouse=True)
+    def reset_compiler(self) -> Iterator[None]:
+        clear_jsonschema_validator_cache()
+        yield
+        set_jsonschema_compiler(None)
+
+    def test_no_compiler(self) -> None:
+        validator = dandi_jsonschema_validator(self.SCHEMA)
+        assert isinstance(validator, Draft202012Validator)
+
+    def test_compiled_check(self) -> None:
+        calls: List[Tuple[Dict[str, Any], type]] = []
+        checked: List[Any] = []
+
+        def compiler(
+            schema: Dict[str, Any], validator_cls: type
+        ) -> Callable[[Any], bool]:
+            calls.append((schema, validator_cls))
+
+            def check(instance: Any) -> bool:
+                checked.append(instance)
+                return isinstance(instance.get("name"), str)
+
+            return check
+
+        set_jsonschema_compiler(compiler)
+        validator = dandi_jsonschema_validator(self.SCHEMA)
+        assert calls == [(self.SCHEMA, Draft202012Validator)]
+        assert validator.schema == self.SCHEMA
+
+        with patch.object(
+            Draft202012Validator, "iter_errors", autospec=True
+        ) as mock_iter_errors:
+            validate_json({"name": "Alice"}, validator)
+        mock_iter_errors.assert_not_called()
+        assert validator.is_valid({"name": "Alice"})
+
+        with pytest.raises(JsonschemaValidationError) as exc_info:
+            validate_json({"name": 123}, validator)
+        assert [e.validator for e in exc_info.value.errors] == ["type"]
+        assert not validator.is_valid({"name": 123})
+        assert checked == [{"name": "Alice"}] * 2 + [{"name": 123}] * 2
+
+    def test_stock_validator_has_final_say(self) -> None:
+        # A compiled check that rejects a valid instance does not make it invalid
+        set_jsonschema_compiler(lambda _schema, _cls: lambda _instance: False)
+        validator = dandi_jsonschema_validator(self.SCHEMA)
+        validate_json({"name": "Alice"}, validator)
+        validator.validate({"name": "Alice"})
+        assert validator.is_valid({"name": "Alice"})
+
+    def test_copy(self) -> None:
+        set_jsonschema_compiler(lambda _schema, _cls: lambda _instance: True)
+        validator = dandi_jsonschema_validator(self.SCHEMA)
+        for validator_copy in (copy(validator), deepcopy(validator)):
+            assert validator_copy.schema == self.SCHEMA
+            assert validator_copy.is_valid({"name": "Alice"})
+        assert not hasattr(validator, "_nonexistent")
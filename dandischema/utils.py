@@ -1,9 +1,25 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from copy import deepcopy
+import hashlib
+from itertools import islice
+import json
 import re
-from typing import Any, Iterator, List, Union, cast, get_args, get_origin
+from threading import Lock
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+)
 
 from jsonschema import Draft7Validator, Draft202012Validator
+from jsonschema.exceptions import ValidationError
 from jsonschema.protocols import Validator as JsonschemaValidator
 from jsonschema.validators import validator_for
 from pydantic import ConfigDict, TypeAdapter
@@ -144,11 +160,110 @@ def sanitize_value(value: str, field: str = "non-extension", sub: str = "-") ->
     return value
 
 
+#: A compiler of JSON schemas, which, given a JSON schema and the jsonschema
+#: validator class selected for it, returns a function that tells whether an
+#: instance is valid against the schema
+JsonschemaCompiler = Callable[
+    [dict[str, Any], type[JsonschemaValidator]], Callable[[Any], bool]
+]
+
+_jsonschema_compiler: JsonschemaCompiler | None = None
+
+#: The maximum number of validators kept in the cache of
+#: `dandi_jsonschema_validator()`
+JSONSCHEMA_VALIDATOR_CACHE_SIZE = 64
+
+# Validators created by `dandi_jsonschema_validator()`, keyed by the digest of their
+# schema and whether they check formats, in least recently used order
+_jsonschema_validator_cache: OrderedDict[tuple[str, bool], JsonschemaValidator] = (
+    OrderedDict()
+)
+_jsonschema_validator_cache_lock = Lock()
+
+
+def clear_jsonschema_validator_cache() -> None:
+    """Clear the cache of validators created by `dandi_jsonschema_validator()`"""
+    with _jsonschema_validator_cache_lock:
+        _jsonschema_validator_cache.clear()
+
+
+def _schema_digest(schema: dict[str, Any]) -> str:
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def set_jsonschema_compiler(compiler: JsonschemaCompiler | None) -> None:
+    """
+    Set the compiler used by `dandi_jsonschema_validator()` to speed up validation
+
+    When a compiler is set, each validator created by `dandi_jsonschema_validator()`
+    first checks an instance with the function the compiler produced for the schema,
+    which is typically much faster than the stock jsonschema validator, e.g., if it
+    is generated code specialized for the schema. Only if the instance fails this
+    check is the stock validator run, to produce the errors, so the errors reported
+    are always the same as those of the stock validator. The compiled check must
+    therefore be at least as strict as the stock validator, including the checking
+    of formats.
+
+    Validators created before the compiler is set are not affected, but they are
+    dropped from the cache of `dandi_jsonschema_validator()`.
+
+    :param compiler: The compiler to use, or `None` to use only the stock jsonschema
+        validators
+    """
+    global _jsonschema_compiler
+    _jsonschema_compiler = compiler
+    clear_jsonschema_validator_cache()
+
+
+class _CompiledJsonschemaValidator:
+    """
+    A jsonschema validator that checks instances with a compiled validation function
+    before falling back to a stock jsonschema validator for the errors
+    """
+
+    def __init__(
+        self, validator: JsonschemaValidator, check: Callable[[Any], bool]
+    ) -> None:
+        self._validator = validator
+        self._check = check
+
+    def __getattr__(self, name: str) -> Any:
+        # Only public attributes are delegated. The wrapped validator is looked up
+        # through `__dict__`, where it may be missing, e.g., in a copy under
+        # construction, so that this does not recurse.
+        if name.startswith("_") or "_validator" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["_validator"], name)
+
+    def is_valid(self, instance: Any) -> bool:
+        return self._check(instance) or self._validator.is_valid(instance)
+
+    def iter_errors(self, instance: Any) -> Iterator[ValidationError]:
+        if self._check(instance):
+            return iter(())
+        return iter(self._validator.iter_errors(instance))
+
+    def validate(self, instance: Any) -> None:
+        if not self._check(instance):
+            self._validator.validate(instance)
+
+
 def dandi_jsonschema_validator(schema: dict[str, Any]) -> JsonschemaValidator:
     """
     Create a JSON Schema validator appropriate for validating instances against the
     JSON schema of a DANDI model
 
+    If a compiler has been set with `set_jsonschema_compiler()`, the validator
+    accepts the instances that pass the function compiled from the schema without
+    running the stock jsonschema validator.
+
+    Validators are cached by the content of their schemas, so calling this function
+    again with an equal schema returns the same validator without checking the
+    schema against its meta-schema again. The cache holds up to
+    `JSONSCHEMA_VALIDATOR_CACHE_SIZE` validators, evicting the least recently used
+    one when full.
+
     :param schema: The JSON schema of the DANDI model to validate against
     :return: The JSON schema validator
     :raises ValueError: If the schema does not have a 'schemaVersion' property that
@@ -180,9 +295,31 @@ def dandi_jsonschema_validator(schema: dict[str, Any]) -> JsonschemaValidator:
         ),
     )
 
-    return jsonschema_validator(
-        schema, check_format=True, default_cls=default_validator_cls
+    check_format = True
+    key = (_schema_digest(schema), check_format)
+    with _jsonschema_validator_cache_lock:
+        if (validator := _jsonschema_validator_cache.get(key)) is not None:
+            _jsonschema_validator_cache.move_to_end(key)
+            return validator
+
+    # Copy the schema so that later modifications of it by the caller do not affect
+    # the cached validator
+    schema = deepcopy(schema)
+    validator = jsonschema_validator(
+        schema, check_format=check_format, default_cls=default_validator_cls
     )
+    if _jsonschema_compiler is not None:
+        check = _jsonschema_compiler(schema, type(validator))
+        validator = cast(
+            JsonschemaValidator, _CompiledJsonschemaValidator(validator, check)
+        )
+
+    with _jsonschema_validator_cache_lock:
+        _jsonschema_validator_cache[key] = validator
+        _jsonschema_validator_cache.move_to_end(key)
+        while len(_jsonschema_validator_cache) > JSONSCHEMA_VALIDATOR_CACHE_SIZE:
+            _jsonschema_validator_cache.popitem(last=False)
+    return validator
 
 
 def jsonschema_validator(
@@ -231,17 +368,47 @@ def jsonschema_validator(
     return validator_cls(schema)  # type: ignore[call-arg]
 
 
-def validate_json(instance: Any, validator: JsonschemaValidator) -> None:
+def iter_json_errors(
+    instance: Any, validator: JsonschemaValidator
+) -> Iterator[ValidationError]:
+    """
+    Lazily iterate over the errors in a data instance detected by a jsonschema
+    validator
+
+    Errors are yielded in the order in which the validator detects them, and the
+    validation stops as soon as the iteration does.
+
+    :param instance: The data instance to validate
+    :param validator: The JSON schema validator to use
+    :return: An iterator of `jsonschema.exceptions.ValidationError` instances
+    """
+    return iter(validator.iter_errors(instance))
+
+
+def validate_json(
+    instance: Any, validator: JsonschemaValidator, *, max_errors: int | None = None
+) -> None:
     """
     Validate a data instance using a jsonschema validator
 
     :param instance: The data instance to validate
     :param validator: The JSON schema validator to use
+    :param max_errors: The maximum number of errors to collect. If `None`, all the
+        errors are collected and sorted by their string representations. Otherwise,
+        the validation stops once this many errors have been detected, and the
+        errors are reported in the order of detection, e.g., `1` only reports the
+        first error detected.
     :raises JsonschemaValidationError: If the metadata instance is invalid, an instance
         of this exception containing a list of `jsonschema.exceptions.ValidationError`
-        instances representing all the errors detected in the validation is raised
+        instances representing the errors detected in the validation is raised
+    :raises ValueError: If `max_errors` is less than 1
     """
-    errs = sorted(validator.iter_errors(instance), key=str)
+    if max_errors is None:
+        errs = sorted(validator.iter_errors(instance), key=str)
+    elif max_errors < 1:
+        raise ValueError(f"max_errors must be at least 1, got {max_errors}")
+    else:
+        errs = list(islice(iter_json_errors(instance, validator), max_errors))
 
     if errs:
         raise JsonschemaValidationError(errs)